@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+import sys
+
+# Shared by the asset scripts so reruns only touch new or changed files.
+# Layout: {"version": 1, "tools": {tool: {source: entry}}} where entry is
+#   {"hash", "size", "mtime_ns", "params", "outputs": {path: [hash, size, mtime_ns]}}
+# Paths are stored relative to the assets/ directory.
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", ".asset_manifest.json")
+MANIFEST_VERSION = 1
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class AssetManifest:
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+        self.tools = {}
+        self.dirty = False
+        self._checked = {}  # key -> (size, mtime_ns) seen by is_up_to_date, before any rewrite
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.tools = data.get("tools", {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable manifest {path}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+    def _key(self, path):
+        return os.path.relpath(os.path.abspath(path), self.base_dir).replace(os.sep, "/")
+
+    def _path(self, key):
+        return os.path.normpath(os.path.join(self.base_dir, key))
+
+    def _matches(self, path, digest, size, mtime_ns):
+        # Only rehash when size or mtime moved since the entry was recorded.
+        # Returns the file's current (size, mtime_ns) if it matches, else None.
+        if not os.path.exists(path):
+            return None
+        stat = _stat_key(path)
+        if stat == (size, mtime_ns) or file_hash(path) == digest:
+            return stat
+        return None
+
+    def _fingerprint(self, path):
+        return [file_hash(path), *_stat_key(path)]
+
+    def is_up_to_date(self, tool, source, params=None):
+        key = self._key(source)
+        if not os.path.exists(source):
+            return False
+        self._checked[key] = _stat_key(source)
+        entry = self.tools.get(tool, {}).get(key)
+        if entry is None:
+            return False
+        if entry.get("params") != _normalize(params):
+            return False
+        outputs = entry.get("outputs", {})
+        for out, (digest, size, mtime_ns) in outputs.items():
+            stat = self._matches(self._path(out), digest, size, mtime_ns)
+            if stat is None:
+                return False
+            if stat != (size, mtime_ns):
+                # Touched but unchanged: store the new stat so the next run doesn't rehash
+                outputs[out] = [digest, *stat]
+                self.dirty = True
+        stat = self._matches(source, entry["hash"], entry["size"], entry["mtime_ns"])
+        if stat is None:
+            return False
+        if stat != (entry["size"], entry["mtime_ns"]):
+            entry["size"], entry["mtime_ns"] = stat
+            self.dirty = True
+        return True
+
+    def record(self, tool, source, params=None, outputs=()):
+        # Call after the outputs are written; for in-place tools the source
+        # hash then describes the processed file, so the next run skips it.
+        key = self._key(source)
+        entries = self.tools.setdefault(tool, {})
+        previous = entries.get(key)
+
+        output_keys = {self._key(out): self._fingerprint(out) for out in outputs}
+        if previous:
+            for old in set(previous.get("outputs", {})) - set(output_keys):
+                self._remove_output(old, key)
+
+        digest, size, mtime_ns = output_keys.get(key) or self._fingerprint(source)
+        entries[key] = {
+            "hash": digest,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "params": _normalize(params),
+            "outputs": output_keys,
+        }
+        if key in output_keys:
+            self._rewritten(tool, key, [digest, size, mtime_ns])
+        self.dirty = True
+
+    def _rewritten(self, tool, key, fingerprint):
+        # An in-place tool replaced the source. Other tools whose only output
+        # is the source itself were up to date with the file it read, so they
+        # are up to date with what it wrote too; otherwise two in-place tools
+        # keep redoing each other's work. Any tool with a derived output (even
+        # one that also rewrites the source, like optimize_assets) built it
+        # from the old pixels, so its next run must see the change.
+        before = self._checked.get(key)
+        if before is None:
+            return
+        for other, entries in self.tools.items():
+            entry = entries.get(key)
+            if other == tool or entry is None or set(entry.get("outputs", {})) != {key}:
+                continue
+            if (entry["size"], entry["mtime_ns"]) != before:
+                continue
+            entry["hash"], entry["size"], entry["mtime_ns"] = fingerprint
+            entry["outputs"][key] = list(fingerprint)
+        self._checked[key] = tuple(fingerprint[1:])
+
+    def remove_stale(self, tool, dry_run=False):
+        # Drop entries whose source is gone and delete the outputs they left behind
+        entries = self.tools.get(tool, {})
+        removed = []
+        for key in sorted(entries):
+            if os.path.exists(self._path(key)):
+                continue
+            for out in entries[key].get("outputs", {}):
+                if out != key and os.path.exists(self._path(out)):
+                    removed.append(self._path(out))
+                    if not dry_run:
+                        self._remove_output(out, key)
+            if not dry_run:
+                del entries[key]
+                self.dirty = True
+        return removed
+
+    def _remove_output(self, out_key, source_key):
+        path = self._path(out_key)
+        if out_key != source_key and os.path.exists(path):
+            os.remove(path)
+            print(f"Removed stale output {path}")
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "tools": self.tools}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def _normalize(params):
+    # Round-trip through JSON so tuples and lists compare equal after a reload
+    return json.loads(json.dumps(params or {}, sort_keys=True))
+
+
+if __name__ == "__main__":
+    dry_run = "--dry-run" in sys.argv
+    manifest = AssetManifest()
+    for tool in sorted(manifest.tools):
+        stale = manifest.remove_stale(tool, dry_run=dry_run)
+        count = len(manifest.tools[tool])
+        print(f"{tool}: {count} entries, {len(stale)} stale outputs" + (" (dry run)" if dry_run else ""))
+        for path in stale:
+            print(f"  {path}")
+    manifest.save()
@@ -0,0 +1,160 @@
+import argparse
+import bisect
+import itertools
+import os
+import re
+import sys
+from translation_usage import STRING_LITERAL, dart_files, string_literals
+
+# Works out which files under assets/car_images the app can actually load.
+# Every 'assets/...' literal in lib/**/*.dart is a path template: ${getIndex(N)}
+# expands to 1..N (see VehicleUtils.getVehicleImage), and $name takes the
+# literals the same file assigns to name (both branches of a ?: count) or
+# compares it with (name == 'Bavora'). Anything else matches one path
+# segment. Files no template reaches (source sheets, force_split.py halves,
+# un-fixed masks) go to an exclusion list for the download bucket.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LIB_DIR = os.path.join(ROOT, 'lib')
+DEFAULT_ROOT = 'assets/car_images'
+DEFAULT_OUT = 'build/car_images_exclude.txt'
+INDEX_FUNCTIONS = ('getIndex',)  # Helpers that return 1..N for a literal N
+
+LITERAL_RE = re.compile(STRING_LITERAL)
+INTERPOLATION_RE = re.compile(r'\$\{\s*(?P<expr>[^}]*?)\s*\}|\$(?P<name>[A-Za-z_]\w*)')
+INDEX_CALL_RE = re.compile(r'(?P<fn>\w+)\(\s*(?P<n>\d+)\s*\)$')
+
+
+def literal_lines(text):
+    # (value, line) of every literal outside comments
+    newlines = [m.start() for m in re.finditer('\n', text)]
+    for start, _, value in string_literals(text):
+        yield value, bisect.bisect_left(newlines, start) + 1
+
+
+def variable_values(text, name):
+    # Literals assigned to or compared with `name` in this file
+    values = []
+    for match in re.finditer(rf'(?<![\w.$]){re.escape(name)}\s*=(?!=)\s*([^;]*);', text):
+        rhs = match.group(1)
+        branches = rhs.split('?', 1)[1] if '?' in rhs else rhs
+        literals = [m.group('key') for m in LITERAL_RE.finditer(branches)]
+        if literals and not LITERAL_RE.sub('', branches).strip(' \t\n:()'):
+            values.extend(literals)
+    for match in re.finditer(rf'(?<![\w.$]){re.escape(name)}\s*==\s*' + STRING_LITERAL, text):
+        values.append(match.group('key'))
+    return [v for v in dict.fromkeys(values) if '$' not in v]
+
+
+def expand(template, text):
+    # Template -> (regex over asset paths, [concrete paths] or None if it
+    # has a wildcard part)
+    parts, choices = [], []
+    pos = 0
+    for match in INTERPOLATION_RE.finditer(template):
+        parts.append(template[pos:match.start()])
+        pos = match.end()
+        expr = match.group('expr') or match.group('name')
+        call = INDEX_CALL_RE.search(expr)
+        if call and call.group('fn') in INDEX_FUNCTIONS:
+            choices.append([str(i) for i in range(1, int(call.group('n')) + 1)])
+        elif re.fullmatch(r'[A-Za-z_]\w*', expr):
+            choices.append(variable_values(text, expr) or None)
+        else:
+            choices.append(None)
+    parts.append(template[pos:])
+
+    pattern = re.escape(parts[0])
+    for values, part in zip(choices, parts[1:]):
+        pattern += ('(?:' + '|'.join(map(re.escape, values)) + ')' if values else '[^/]*') + re.escape(part)
+    if any(values is None for values in choices):
+        return re.compile(pattern), None
+    paths = [''.join(itertools.chain.from_iterable(zip(parts, combo + ('',))))
+             for combo in itertools.product(*choices)]
+    return re.compile(pattern), paths
+
+
+def find_templates(lib_dir=LIB_DIR):
+    # {template: {'regex', 'paths', 'sites'}} for every asset path literal
+    templates = {}
+    for path in dart_files(lib_dir):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        rel = os.path.relpath(path, ROOT)
+        for value, line in literal_lines(text):
+            if not value.startswith('assets/'):
+                continue
+            key = (value, rel) if '$' in value else (value, None)
+            if key not in templates:
+                regex, paths = expand(value, text)
+                templates[key] = {'template': value, 'regex': regex, 'paths': paths, 'sites': []}
+            templates[key]['sites'].append(f'{rel}:{line}')
+    return list(templates.values())
+
+
+def disk_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(dirpath, f), ROOT).replace(os.sep, '/')
+        for dirpath, _, filenames in os.walk(os.path.join(ROOT, root))
+        for f in filenames if not f.startswith('.')
+    )
+
+
+def analyze(root=DEFAULT_ROOT, lib_dir=LIB_DIR):
+    # Returns (templates, reachable, unreachable, missing) for files under root
+    templates = find_templates(lib_dir)
+    files = disk_files(root)
+    prefix = root.rstrip('/') + '/'
+    on_disk = set(files)
+    reachable, missing = set(), []
+    for t in templates:
+        matched = [f for f in files if t['regex'].fullmatch(f)]
+        t['matched'] = len(matched)
+        reachable.update(matched)
+        if t['paths'] is not None:
+            missing.extend((p, t) for p in t['paths'] if p.startswith(prefix) and p not in on_disk)
+    unreachable = [f for f in files if f not in reachable]
+    return templates, sorted(reachable), unreachable, missing
+
+
+def size_of(paths):
+    return sum(os.path.getsize(os.path.join(ROOT, p)) for p in paths)
+
+
+def report(root=DEFAULT_ROOT, output=DEFAULT_OUT, dry_run=False, verbose=False):
+    templates, reachable, unreachable, missing = analyze(root)
+    prefix = root.rstrip('/') + '/'
+    relevant = [t for t in templates if t['template'].startswith(prefix)]
+    print(f"{len(relevant)} path templates under {root} in lib/**/*.dart")
+    for t in relevant:
+        if verbose or t['paths'] is None or not t['matched']:
+            kind = f"{len(t['paths'])} paths" if t['paths'] is not None else 'wildcard'
+            print(f"  {t['template']}  ({kind}, {t['matched']} on disk)  {', '.join(t['sites'])}")
+
+    total = len(reachable) + len(unreachable)
+    print(f"\n{len(reachable)} of {total} files reachable ({size_of(reachable) / 1e6:.1f} MB); "
+          f"{len(unreachable)} unreachable ({size_of(unreachable) / 1e6:.1f} MB)")
+    for path in unreachable:
+        print(f"  {path}")
+    if missing:
+        print(f"\n{len(missing)} referenced files are missing on disk:")
+        for path, t in missing:
+            print(f"  {path}  ({', '.join(t['sites'])})")
+
+    if not dry_run:
+        out_path = os.path.join(ROOT, output)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8') as f:
+            f.writelines(f'{path}\n' for path in unreachable)
+        print(f"\nWrote {len(unreachable)} exclusions to {output}")
+    return len(missing)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List asset files no path in lib/ can reach.")
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT, help='asset folder to check (default: %(default)s)')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUT, help='exclusion list to write (default: %(default)s)')
+    parser.add_argument('-n', '--dry-run', action='store_true', help='only print the report')
+    parser.add_argument('-v', '--verbose', action='store_true', help='list every template, not just wildcards and misses')
+    args = parser.parse_args()
+    sys.exit(1 if report(args.root, args.output, args.dry_run, args.verbose) else 0)
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+from align_mask import hits_bbox
+from asset_manifest import AssetManifest
+
+# Crops the transparent border remove_background.py leaves around each car,
+# so GameImage decodes and uploads only the pixels that show. The box comes
+# from align_mask.hits_bbox over the alpha channel (alpha > --threshold).
+# trim_index.json in the output folder records, per image, the original
+# canvas and where the trimmed image sits on it, so a widget can lay it out
+# exactly as before:
+#   {"renauva/flow/flow_1.png": {"canvas": [1080, 1080], "offset": [81, 54], "size": [924, 988]}}
+# The output never goes back into the root: no widget reads the index yet,
+# so trimmed files in place would shift every car GameImage/VehicleImage
+# lays out (BoxFit scales the crop up) and the paint masks would no longer
+# line up.
+
+TOOL_NAME = "auto_trim"
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_OUT = "build/trimmed"
+INDEX_NAME = "trim_index.json"
+INDEX_VERSION = 1
+
+
+def alpha_box(img, threshold=0):
+    # (left, top, right, bottom) of the visible pixels; the whole canvas for
+    # opaque or fully transparent images
+    if img.mode != "RGBA":
+        return (0, 0, img.width, img.height)
+    min_x, max_x, min_y, max_y = hits_bbox(np.asarray(img.getchannel("A")) > threshold)
+    if min_x > max_x:
+        return (0, 0, img.width, img.height)
+    return (min_x, min_y, max_x + 1, max_y + 1)
+
+
+def trim_file(path, root, out_dir, threshold=0, dry_run=False):
+    rel = os.path.relpath(path, root).replace(os.sep, "/")
+    out_path = os.path.join(out_dir, rel)
+    try:
+        with Image.open(path) as img:
+            img.load()
+            box = alpha_box(img, threshold)
+            canvas = [img.width, img.height]
+            if not dry_run:
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                if box != (0, 0, img.width, img.height):
+                    img.crop(box).save(out_path)
+                else:
+                    img.save(out_path)
+        return {"path": path, "rel": rel, "out_path": out_path, "canvas": canvas,
+                "offset": [box[0], box[1]], "size": [box[2] - box[0], box[3] - box[1]]}
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def load_index(out_dir):
+    try:
+        with open(os.path.join(out_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index["images"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_index(out_dir, images):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, INDEX_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "images": images}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def decoded_bytes(width, height):
+    return width * height * 4
+
+
+def trim(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, threshold=0, workers=None, force=False, dry_run=False):
+    root_dir = os.path.abspath(root)
+    if os.path.commonpath([root_dir, os.path.abspath(out_dir)]) == root_dir:
+        raise ValueError(f"{out_dir} is {root} or inside it; trimmed images must not replace the ones the app lays out")
+    paths = sorted(
+        os.path.join(dirpath, f)
+        for dirpath, _, filenames in os.walk(root)
+        for f in filenames if f.lower().endswith(".png")
+    )
+    params = {"threshold": threshold, "out_dir": out_dir}
+    index = load_index(out_dir)
+
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    pending = paths
+    if not force and not dry_run:
+        pending = [
+            p for p in paths
+            if os.path.relpath(p, root).replace(os.sep, "/") not in index
+            or not manifest.is_up_to_date(TOOL_NAME, p, params)
+        ]
+        print(f"{len(paths) - len(pending)} of {len(paths)} images already up to date")
+
+    start = time.perf_counter()
+    results = []
+    job = partial(trim_file, root=root, out_dir=out_dir, threshold=threshold, dry_run=dry_run)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(job, pending, chunksize=4):
+            if "error" in result:
+                print(f"Error trimming {result['path']}: {result['error']}")
+                continue
+            index[result["rel"]] = {k: result[k] for k in ("canvas", "offset", "size")}
+            if not dry_run:
+                manifest.record(TOOL_NAME, result["path"], params, outputs=[result["out_path"]])
+            results.append(result)
+    print(f"Trimmed {len(results)} images in {time.perf_counter() - start:.2f}s")
+
+    # The index also covers images skipped as up to date
+    known = {os.path.relpath(p, root).replace(os.sep, "/") for p in paths}
+    index = {rel: entry for rel, entry in index.items() if rel in known}
+    if not dry_run:
+        save_index(out_dir, index)
+    print_report(index.values())
+
+
+def print_report(entries):
+    entries = list(entries)
+    if not entries:
+        return
+    before = sum(decoded_bytes(*e["canvas"]) for e in entries)
+    after = sum(decoded_bytes(*e["size"]) for e in entries)
+    trimmed = sum(e["size"] != e["canvas"] for e in entries)
+    worst = min(entries, key=lambda e: (e["size"][0] * e["size"][1]) / (e["canvas"][0] * e["canvas"][1]))
+    print(f"\n{trimmed} of {len(entries)} images had a transparent border")
+    print(f"Decoded RGBA: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ({(1 - after / before) * 100:.1f}% less); "
+          f"most padded keeps {worst['size'][0]}x{worst['size'][1]} of {worst['canvas'][0]}x{worst['canvas'][1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crop transparent borders and record the original canvas.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT, help="where trimmed images and trim_index.json go, outside the root (default: %(default)s)")
+    parser.add_argument("-t", "--threshold", type=int, default=0, help="alpha at or below this counts as transparent (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="retrim images the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report the savings, write nothing")
+    args = parser.parse_args()
+    try:
+        trim(args.root, args.out_dir, args.threshold, args.workers, args.force, args.dry_run)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,81 @@
+import struct
+import numpy as np
+
+# Uncompressed 24/32-bit BMP access through a memory map. Pixels are exposed
+# as a (height, width, channels) BGR(A) view in visual top-to-bottom order:
+# row padding is skipped with strides and bottom-up files are flipped with a
+# negative stride, so nothing is copied.
+
+HEADER_SIZE = 54
+
+
+class Bitmap:
+    def __init__(self, filename, header, width, height, bpp, top_down, pixels):
+        self.filename = filename
+        self.header = header
+        self.width = width
+        self.height = height
+        self.bpp = bpp
+        self.top_down = top_down
+        self.pixels = pixels
+
+    @property
+    def row_size(self):
+        return row_size(self.width, self.bpp)
+
+    def __repr__(self):
+        order = "top-down" if self.top_down else "bottom-up"
+        return f"Bitmap({self.filename}, {self.width}x{self.height}, {self.bpp} bpp, {order})"
+
+
+def row_size(width, bpp):
+    # Rows are padded to a multiple of 4 bytes
+    return ((width * bpp + 31) // 32) * 4
+
+
+def parse_header(header):
+    if len(header) < HEADER_SIZE or header[:2] != b'BM':
+        raise ValueError("not a BMP file")
+    pixel_offset = struct.unpack('<I', header[10:14])[0]
+    width = struct.unpack('<i', header[18:22])[0]  # Signed
+    height = struct.unpack('<i', header[22:26])[0]  # Signed, negative means top-down
+    bpp = struct.unpack('<H', header[28:30])[0]
+    compression = struct.unpack('<I', header[30:34])[0]
+    if bpp not in (24, 32) or compression not in (0, 3):
+        raise ValueError(f"unsupported BMP ({bpp} bpp, compression {compression})")
+    return pixel_offset, abs(width), abs(height), bpp, height < 0
+
+
+def _pixel_view(buffer, pixel_offset, width, height, bpp, top_down):
+    channels = bpp // 8
+    stride = row_size(width, bpp)
+    view = np.ndarray(
+        (height, width, channels), dtype=np.uint8, buffer=buffer,
+        offset=pixel_offset, strides=(stride, channels, 1),
+    )
+    return view if top_down else view[::-1]
+
+
+def read_bmp(filename, mode='r'):
+    # mode is passed to np.memmap: 'r' read-only, 'r+' write through, 'c' copy-on-write
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    pixel_offset, width, height, bpp, top_down = parse_header(header)
+
+    data = np.memmap(filename, dtype=np.uint8, mode=mode)
+    if len(data) < pixel_offset + row_size(width, bpp) * height:
+        raise ValueError(f"{filename} is truncated")
+    pixels = _pixel_view(data, pixel_offset, width, height, bpp, top_down)
+    return Bitmap(filename, bytes(data[:pixel_offset]), width, height, bpp, top_down, pixels)
+
+
+def write_bmp(filename, template, pixels):
+    # Writes pixels (visual order, same shape as template.pixels) using the
+    # template's headers, so orientation and metadata are preserved
+    pixel_offset = len(template.header)
+    size = pixel_offset + template.row_size * template.height
+    out = np.memmap(filename, dtype=np.uint8, mode='w+', shape=(size,))
+    out[:pixel_offset] = np.frombuffer(template.header, dtype=np.uint8)
+    _pixel_view(out, pixel_offset, template.width, template.height, template.bpp, template.top_down)[:] = pixels
+    out.flush()
+    del out
@@ -0,0 +1,287 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from asset_reachability import analyze
+
+# Packs assets/car_images into a few large content-addressed chunks so a
+# first run downloads a handful of files in parallel instead of one storage
+# object per image. Model folders are never split, and a chunk ends after a
+# folder whose path hash is 0 mod FOLDERS_PER_CHUNK (or when it would pass
+# MAX_CHUNK), so boundaries only depend on the folders themselves: changing
+# an image re-creates its own chunk and leaves the others byte-identical.
+# Chunks are the raw files back to back, named by their sha256;
+# manifest.json maps every asset to (chunk, offset, length, sha256) and its
+# version goes up whenever the chunk set changes, so a client only fetches
+# chunk ids it doesn't have. --serve and --benchmark run a local HTTP
+# stand-in for cloud storage with a per-request delay and a shared
+# bandwidth cap, so parallel downloads can't beat the link. It serves the
+# pack directory only; the benchmark adds the manifest's assets by name for
+# its per-file baseline.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_OUT = "build/asset_packs"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+FOLDERS_PER_CHUNK = 4
+MAX_CHUNK = 32 * 1024 * 1024
+DEFAULT_PORT = 8765
+DEFAULT_LATENCY = 0.05  # Seconds per request, roughly a storage round trip
+DEFAULT_BANDWIDTH = 10.0  # MB/s shared by all connections
+DEFAULT_WORKERS = 4
+BLOCK_SIZE = 64 * 1024
+
+
+def asset_files(root, reachable_only=True):
+    # Paths relative to the repo root, grouped per folder in path order
+    if reachable_only:
+        _, files, _, _ = analyze(root)
+    else:
+        files = sorted(
+            os.path.relpath(os.path.join(dirpath, f), ROOT).replace(os.sep, "/")
+            for dirpath, _, filenames in os.walk(os.path.join(ROOT, root))
+            for f in filenames if not f.startswith(".")
+        )
+    folders = {}
+    for path in files:
+        folders.setdefault(os.path.dirname(path), []).append(path)
+    return [(folder, folders[folder]) for folder in sorted(folders)]
+
+
+def is_boundary(folder):
+    digest = hashlib.sha256(folder.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % FOLDERS_PER_CHUNK == 0
+
+
+def plan_chunks(folders, max_chunk=MAX_CHUNK):
+    # [[path, ...], ...]: whole folders, cut after boundary folders
+    chunks, current, size = [], [], 0
+    for folder, paths in folders:
+        folder_size = sum(os.path.getsize(os.path.join(ROOT, p)) for p in paths)
+        if current and size + folder_size > max_chunk:
+            chunks.append(current)
+            current, size = [], 0
+        current.extend(paths)
+        size += folder_size
+        if is_boundary(folder):
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def write_chunk(paths, out_dir, dry_run=False):
+    # Streams the files into a temporary, then renames it to its hash
+    chunk_hash = hashlib.sha256()
+    files = {}
+    offset = 0
+    tmp_path = os.path.join(out_dir, f".chunk-{os.getpid()}-{threading.get_ident()}.tmp")
+    out = None if dry_run else open(tmp_path, "wb")
+    try:
+        for path in paths:
+            with open(os.path.join(ROOT, path), "rb") as f:
+                data = f.read()
+            chunk_hash.update(data)
+            if out:
+                out.write(data)
+            files[path] = {"offset": offset, "length": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+            offset += len(data)
+    finally:
+        if out:
+            out.close()
+    chunk_id = chunk_hash.hexdigest()
+    if not dry_run:
+        os.replace(tmp_path, os.path.join(out_dir, f"{chunk_id}.pack"))
+    return chunk_id, offset, files
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") == MANIFEST_FORMAT:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"format": MANIFEST_FORMAT, "version": 0, "chunks": [], "files": {}}
+
+
+def build(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, reachable_only=True, dry_run=False):
+    previous = load_manifest(out_dir)
+    known = {c["id"]: c for c in previous["chunks"]}
+    start = time.perf_counter()
+    chunks = plan_chunks(asset_files(root, reachable_only))
+    if not dry_run:
+        os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {"format": MANIFEST_FORMAT, "version": previous["version"], "chunks": [], "files": {}}
+    reused = 0
+    for paths in chunks:
+        chunk_id, size, files = write_chunk(paths, out_dir, dry_run)
+        reused += chunk_id in known
+        manifest["chunks"].append({"id": chunk_id, "bytes": size, "files": len(files)})
+        for path, entry in files.items():
+            manifest["files"][path] = {"chunk": chunk_id, **entry}
+    if [c["id"] for c in manifest["chunks"]] != [c["id"] for c in previous["chunks"]]:
+        manifest["version"] += 1
+
+    total = sum(c["bytes"] for c in manifest["chunks"])
+    print(f"Packed {len(manifest['files'])} files ({total / 1e6:.1f} MB) into {len(chunks)} chunks "
+          f"in {time.perf_counter() - start:.2f}s; version {manifest['version']}")
+    for c in manifest["chunks"]:
+        print(f"  {c['id'][:16]}  {c['bytes'] / 1e6:6.1f} MB  {c['files']:3} files"
+              f"{'  (unchanged)' if c['id'] in known else ''}")
+    changed = [c for c in manifest["chunks"] if c["id"] not in known]
+    print(f"{reused} of {len(chunks)} chunks unchanged since version {previous['version']}; "
+          f"an update downloads {sum(c['bytes'] for c in changed) / 1e6:.1f} MB")
+
+    if not dry_run:
+        current = {f"{c['id']}.pack" for c in manifest["chunks"]}
+        for name in os.listdir(out_dir):
+            if name.endswith(".pack") and name not in current:
+                os.remove(os.path.join(out_dir, name))
+        tmp_path = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+    return manifest
+
+
+class DelayedHandler(SimpleHTTPRequestHandler):
+    # Static files from `root` plus the exact paths in `files`; each request
+    # waits `latency` seconds and every block sent reserves its slot on one
+    # shared link
+    root = None
+    files = {}  # URL path -> file on disk
+    latency = 0.0
+    bandwidth = None  # bytes/s
+    link_lock = threading.Lock()
+    link_free_at = 0.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=self.root, **kwargs)
+
+    def translate_path(self, path):
+        rel = urllib.parse.unquote(urllib.parse.urlsplit(path).path).lstrip("/")
+        if rel in self.files:
+            return self.files[rel]
+        return super().translate_path(path)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def copyfile(self, source, outputfile):
+        if not self.bandwidth:
+            return super().copyfile(source, outputfile)
+        cls = type(self)
+        for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+            with cls.link_lock:
+                done = max(time.perf_counter(), cls.link_free_at) + len(block) / self.bandwidth
+                cls.link_free_at = done
+            time.sleep(max(0.0, done - time.perf_counter()))
+            outputfile.write(block)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(root, port=DEFAULT_PORT, latency=DEFAULT_LATENCY, bandwidth=DEFAULT_BANDWIDTH, files=None):
+    handler = type("Handler", (DelayedHandler,), {
+        "root": root,
+        "files": files or {},
+        "latency": latency,
+        "bandwidth": bandwidth * 1e6 if bandwidth else None,
+        "link_lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(base_url, path):
+    with urllib.request.urlopen(f"{base_url}/{urllib.request.pathname2url(path)}") as response:
+        return response.read()
+
+
+def benchmark(manifest, out_dir=DEFAULT_OUT, port=DEFAULT_PORT, latency=DEFAULT_LATENCY,
+              bandwidth=DEFAULT_BANDWIDTH, workers=DEFAULT_WORKERS):
+    files = {path: os.path.join(ROOT, path) for path in manifest["files"]}
+    server = start_server(out_dir, port, latency, bandwidth, files)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        # What AssetService does today: one object per file, one at a time
+        start = time.perf_counter()
+        for path in manifest["files"]:
+            fetch(base_url, path)
+        per_file = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            ids = [c["id"] for c in manifest["chunks"]]
+            chunks = dict(zip(ids, pool.map(partial(fetch, base_url), [f"{i}.pack" for i in ids])))
+        packed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    bad = [
+        path for path, e in manifest["files"].items()
+        if hashlib.sha256(chunks[e["chunk"]][e["offset"]:e["offset"] + e["length"]]).hexdigest() != e["sha256"]
+    ]
+    link = f"{bandwidth:g} MB/s" if bandwidth else "unlimited"
+    print(f"\nLocal server, {latency * 1000:.0f}ms per request, {link} link:")
+    print(f"  {len(manifest['files'])} files one by one: {per_file:.2f}s")
+    print(f"  {len(manifest['chunks'])} chunks, {workers} at a time: {packed:.2f}s ({per_file / packed:.1f}x)")
+    if bad:
+        print(f"  ❌ {len(bad)} files failed their sha256 check, e.g. {bad[0]}")
+    else:
+        print("  ✅ every file unpacked with a matching sha256")
+    return len(bad)
+
+
+def serve(out_dir=DEFAULT_OUT, port=DEFAULT_PORT, latency=DEFAULT_LATENCY, bandwidth=DEFAULT_BANDWIDTH):
+    server = start_server(out_dir, port, latency, bandwidth)
+    link = f"{bandwidth:g} MB/s" if bandwidth else "unlimited"
+    print(f"Serving {out_dir} on http://127.0.0.1:{server.server_address[1]} "
+          f"({latency * 1000:.0f}ms per request, {link} link), Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack car images into content-addressed chunks with a manifest.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT, help="where chunks and manifest.json go (default: %(default)s)")
+    parser.add_argument("--all", action="store_true", help="include files asset_reachability.py finds unreachable")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only print the chunk plan, write nothing")
+    parser.add_argument("--serve", action="store_true", help="serve the chunks and manifest over HTTP after building")
+    parser.add_argument("--benchmark", action="store_true", help="time per-file vs chunked downloads from a local server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="local server port (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY * 1000,
+                        help="simulated ms per request (default: %(default)s)")
+    parser.add_argument("--bandwidth", type=float, default=DEFAULT_BANDWIDTH,
+                        help="simulated link speed in MB/s, 0 for unlimited (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS, help="parallel chunk downloads (default: %(default)s)")
+    args = parser.parse_args()
+
+    out_dir = os.path.join(ROOT, args.out_dir)
+    manifest = build(args.root, out_dir, not args.all, args.dry_run)
+    failed = 0
+    if args.benchmark and not args.dry_run:
+        failed = benchmark(manifest, out_dir, args.port, args.latency / 1000, args.bandwidth, args.workers)
+    if args.serve:
+        serve(out_dir, args.port, args.latency / 1000, args.bandwidth)
+    sys.exit(1 if failed else 0)
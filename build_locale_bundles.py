@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import sys
+import time
+from compare_translations import LANG_DIR, discover_locales, load_locale, walk
+from translation_usage import reachable
+
+# Build step for LocalizationService: flattens each assets/lang/*.json to
+# dotted keys and writes assets/lang_bundle/<code>.json, which is what
+# pubspec.yaml ships and the app loads straight into a flat key -> text map
+# (translate() is then one lookup instead of a walk per segment).
+# Bundle layout: {"k": [keys], "v": [values]}, keys sorted and front-coded on
+# whole segments ("2:title" is the previous key's first two segments plus
+# ".title"), and a value repeated from earlier stored as the int index of its
+# first occurrence. Without the coding, flat keys would repeat every prefix
+# and come out larger than the nested source.
+# --strip-unused also drops keys no string in lib/ can reach; keys that only
+# arrive from backend data would be lost, so it is opt-in.
+# Rerun after editing assets/lang/; --check (run by tests/) fails while a
+# bundle is stale.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_DIR = os.path.join(ROOT, 'assets', 'lang_bundle')
+FRONT_CODED_RE = re.compile(r'(\d+):(.*)', re.DOTALL)
+
+
+def leaf_count(data):
+    return sum(1 for _, value in walk(data) if not isinstance(value, dict))
+
+
+def prune(data, keep, prefix=''):
+    # Copy of data with only the leaves whose dotted key passes keep();
+    # sections left empty go too. Lists stay whole as values for trList().
+    pruned = {}
+    for name, value in data.items():
+        key = f"{prefix}.{name}" if prefix else name
+        if isinstance(value, dict):
+            value = prune(value, keep, key)
+            if value:
+                pruned[name] = value
+        elif keep(key):
+            pruned[name] = value
+    return pruned
+
+
+def encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def flatten(data):
+    return dict(sorted((key, value) for key, value in walk(data) if not isinstance(value, dict)))
+
+
+def pack(flat):
+    # flat: {dotted key: text or list}, sorted; returns the bundle layout
+    keys, values, first = [], [], {}
+    previous = []
+    for key, value in flat.items():
+        if not isinstance(value, (str, list)):
+            raise ValueError(f"'{key}': {type(value).__name__} values are not supported")
+        if FRONT_CODED_RE.fullmatch(key):
+            raise ValueError(f"'{key}' reads as a front-coded key")
+        parts = key.split('.')
+        shared = 0
+        while shared < min(len(previous), len(parts) - 1) and previous[shared] == parts[shared]:
+            shared += 1
+        keys.append(f"{shared}:{'.'.join(parts[shared:])}" if shared else key)
+        previous = parts
+
+        text = encode(value)
+        # Short values cost less than the index that would replace them
+        if text in first and len(text) > len(str(first[text])):
+            values.append(first[text])
+        else:
+            first.setdefault(text, len(values))
+            values.append(value)
+    return {'k': keys, 'v': values}
+
+
+def unpack(bundle):
+    # What LocalizationService._unpackBundle does on load
+    flat = {}
+    previous = []
+    for key, value in zip(bundle['k'], bundle['v']):
+        match = FRONT_CODED_RE.fullmatch(key)
+        if match:
+            key = '.'.join(previous[:int(match.group(1))] + [match.group(2)])
+        previous = key.split('.')
+        flat[key] = bundle['v'][value] if isinstance(value, int) else value
+    return flat
+
+
+def timed(job, repeat=50):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        job()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def lookup_nested(tree, keys):
+    # translate() on the nested tree: one map step per segment
+    for key in keys:
+        value = tree
+        for part in key.split('.'):
+            value = value[part]
+
+
+def lookup_flat(flat, keys):
+    for key in keys:
+        flat[key]
+def build(lang_dir=LANG_DIR, bundle_dir=BUNDLE_DIR, strip_unused=False, check=False):
+    if strip_unused:
+        literals, dynamic = reachable()
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    stale = 0
+    print(f"{'locale':<8}{'keys':>7}{'stripped':>10}{'source':>10}{'bundle':>10}{'load ms':>16}{'lookup ms':>16}")
+    for code, path in discover_locales(lang_dir).items():
+        data, errors = load_locale(path)
+        if data is None:
+            print(f"❌ {errors[0]}")
+            stale += 1
+            continue
+
+        keys = leaf_count(data)
+        stripped = 0
+        if strip_unused:
+            data = prune(data, lambda k: k in literals or bool(dynamic and dynamic.fullmatch(k)))
+            stripped = keys - leaf_count(data)
+            keys -= stripped
+
+        try:
+            bundle = encode(pack(flatten(data)))
+        except ValueError as e:
+            print(f"❌ {path}: {e}")
+            stale += 1
+            continue
+        out_path = os.path.join(bundle_dir, f"{code}.json")
+        if check:
+            try:
+                with open(out_path, 'r', encoding='utf-8') as f:
+                    current = f.read()
+            except OSError:
+                current = None
+            if current != bundle:
+                print(f"❌ {out_path} is out of date")
+                stale += 1
+                continue
+        else:
+            with open(out_path, 'w', encoding='utf-8') as f:
+                f.write(bundle)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        source_size = len(source.encode('utf-8'))
+        bundle_size = len(bundle.encode('utf-8'))
+        # Load ends where the app starts translating (nested tree vs flat
+        # map); lookup resolves every key once, as translate() would
+        flat = unpack(json.loads(bundle))
+        load_before = timed(lambda: json.loads(source))
+        load_after = timed(lambda: unpack(json.loads(bundle)))
+        lookup_before = timed(lambda: lookup_nested(data, flat))
+        lookup_after = timed(lambda: lookup_flat(flat, flat))
+        print(f"{code:<8}{keys:>7}{stripped:>10}{source_size:>10}{bundle_size:>10}"
+              f"{load_before:>7.2f} -> {load_after:<5.2f}{lookup_before:>7.2f} -> {lookup_after:.2f}")
+    return stale
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    unknown = [a for a in args if a not in ('--strip-unused', '--check')]
+    if unknown:
+        print("Usage: python3 build_locale_bundles.py [--strip-unused] [--check]")
+        sys.exit(1)
+    sys.exit(1 if build(strip_unused='--strip-unused' in args, check='--check' in args) else 0)
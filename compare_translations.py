@@ -1,33 +1,123 @@
 import json
+import os
+import re
+import sys
+
+LANG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'lang')
+REFERENCE_LOCALE = 'en'  # Fallback language of LocalizationService
+PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+def discover_locales(lang_dir=LANG_DIR):
+    return {
+        os.path.splitext(name)[0]: os.path.join(lang_dir, name)
+        for name in sorted(os.listdir(lang_dir))
+        if name.endswith('.json')
+    }
+
+def load_locale(path):
+    # Returns (data, errors). Duplicate keys are legal JSON but json.load
+    # silently keeps the last one, so they are reported as errors too.
+    duplicates = []
+
+    def check_pairs(pairs):
+        seen = set()
+        for key, _ in pairs:
+            if key in seen:
+                duplicates.append(key)
+            seen.add(key)
+        return dict(pairs)
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f, object_pairs_hook=check_pairs)
+    except json.JSONDecodeError as e:
+        return None, [f"{path}:{e.lineno}:{e.colno}: {e.msg}"]
+    except (OSError, UnicodeDecodeError) as e:
+        return None, [f"{path}: {e}"]
+
+    errors = [f"{path}: duplicate key '{key}'" for key in duplicates]
+    if not isinstance(data, dict):
+        errors.append(f"{path}: top level is not an object")
+        data = None
+    return data, errors
+
+def walk(obj, prefix=""):
+    # Yields (dotted key, value) for every nested key, iteratively
+    stack = [(prefix, obj)]
+    while stack:
+        base, node = stack.pop()
+        for k, v in node.items():
+            full_key = f"{base}.{k}" if base else k
+            yield full_key, v
+            if isinstance(v, dict):
+                stack.append((full_key, v))
 
 def get_keys(obj, prefix=""):
+    return {key for key, _ in walk(obj, prefix)}
+
+def placeholders(value):
+    if isinstance(value, str):
+        return frozenset(PLACEHOLDER_RE.findall(value))
+    if isinstance(value, list):
+        return frozenset(p for item in value if isinstance(item, str) for p in PLACEHOLDER_RE.findall(item))
+    return None
+
+def index_locale(data):
+    # One pass: every key plus the placeholder set of each leaf that has text
     keys = set()
-    for k, v in obj.items():
-        full_key = f"{prefix}.{k}" if prefix else k
-        keys.add(full_key)
-        if isinstance(v, dict):
-            keys.update(get_keys(v, full_key))
-    return keys
-
-try:
-    with open('/Users/selimyay/cebinden/assets/translations/en.json', 'r') as f:
-        en_data = json.load(f)
-    with open('/Users/selimyay/cebinden/assets/translations/tr.json', 'r') as f:
-        tr_data = json.load(f)
-
-    en_keys = get_keys(en_data)
-    tr_keys = get_keys(tr_data)
-
-    missing_in_en = tr_keys - en_keys
-    missing_in_tr = en_keys - tr_keys
-
-    print("Missing in en.json:")
-    for k in sorted(missing_in_en):
-        print(k)
-
-    print("\nMissing in tr.json:")
-    for k in sorted(missing_in_tr):
-        print(k)
-
-except Exception as e:
-    print(f"Error: {e}")
+    params = {}
+    for key, value in walk(data):
+        keys.add(key)
+        found = placeholders(value)
+        if found is not None:
+            params[key] = found
+    return keys, params
+
+def compare(locales, reference=REFERENCE_LOCALE):
+    indexed = {}
+    problems = 0
+    for code, path in locales.items():
+        data, errors = load_locale(path)
+        for error in errors:
+            print(f"❌ {error}")
+        problems += len(errors)
+        if data is not None:
+            indexed[code] = index_locale(data)
+
+    if reference not in indexed:
+        print(f"❌ Reference locale '{reference}' is missing or invalid, skipping key comparison")
+        return problems + 1
+
+    ref_keys, ref_params = indexed[reference]
+    print(f"Reference {reference}.json: {len(ref_keys)} keys")
+    for code, (keys, params) in indexed.items():
+        if code == reference:
+            continue
+        missing = ref_keys - keys
+        extra = keys - ref_keys
+        mismatched = [
+            key for key in ref_params.keys() & params.keys()
+            if ref_params[key] != params[key]
+        ]
+        problems += len(missing) + len(extra) + len(mismatched)
+
+        status = "✅" if not (missing or extra or mismatched) else "❌"
+        print(f"\n{status} {code}.json: {len(keys)} keys, {len(missing)} missing, {len(extra)} extra, {len(mismatched)} placeholder mismatches")
+        if missing:
+            print(f"Missing in {code}.json:")
+            for k in sorted(missing):
+                print(f"  {k}")
+        if extra:
+            print(f"Extra in {code}.json:")
+            for k in sorted(extra):
+                print(f"  {k}")
+        for k in sorted(mismatched):
+            expected = ', '.join(sorted(ref_params[k])) or '-'
+            found = ', '.join(sorted(params[k])) or '-'
+            print(f"  {k}: placeholders {{{found}}}, {reference}.json has {{{expected}}}")
+    return problems
+
+if __name__ == "__main__":
+    lang_dir = sys.argv[1] if len(sys.argv) > 1 else LANG_DIR
+    problems = compare(discover_locales(lang_dir))
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,263 @@
+import json
+import os
+import re
+import sys
+
+# Validates assets/vehicle_data/*/models_config.json and compiles them into
+# one compact bundle with the strings already parsed: "2500000-3500000"
+# becomes [2500000, 3500000], and year-keyed maps like
+#   {"2010-2025": ["Benzin"], "2020-2025": ["Hybrid"]}
+# become non-overlapping interval tables
+#   [[2010, 2019, ["Benzin"]], [2020, 2025, ["Benzin", "Hybrid"]]]
+# Descriptions and notes stay in the source files; the bundle only carries
+# what market generation reads. Nothing in lib/ loads it yet:
+# market_refresh_service.dart still hardcodes these tables.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+VEHICLE_DATA_DIR = os.path.join(ROOT, 'assets', 'vehicle_data')
+BUNDLE_PATH = os.path.join(VEHICLE_DATA_DIR, 'bundle.json')
+BUNDLE_VERSION = 1
+
+SPAWN_TOLERANCE = 0.01  # How far a set of spawn rates may sum away from 1
+YEAR_MIN, YEAR_MAX = 1950, 2100
+
+RANGE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?)\s*)?(\+)?\s*$')
+
+# field -> (type, required)
+BRAND_SCHEMA = {
+    'brand': (str, True),
+    'spawnRate': ((int, float), True),
+    'description': (str, False),
+    'models': (list, True),
+    'gameplayNotes': (dict, False),
+}
+MODEL_SCHEMA = {
+    'code': (str, True),
+    'realName': (str, False),
+    'spawnRate': ((int, float), True),
+    'description': (str, False),
+    'segment': (str, True),
+    'basePriceTL': ((int, float), True),
+    'priceRange': (str, True),
+    'bodyTypes': (dict, True),
+    'fuelTypes': (dict, True),
+    'transmissions': (dict, True),
+    'driveType': (str, True),
+    'engineSizeRange': (str, True),
+    'horsepowerRange': (str, True),
+    'notes': (list, False),
+}
+
+
+def discover_configs(data_dir=VEHICLE_DATA_DIR):
+    return {
+        name: os.path.join(data_dir, name, 'models_config.json')
+        for name in sorted(os.listdir(data_dir))
+        if os.path.isfile(os.path.join(data_dir, name, 'models_config.json'))
+    }
+
+
+def parse_range(text):
+    # "1.0-1.6" -> (1.0, 1.6, False); "2.0" -> (2.0, 2.0, False);
+    # "15000000-25000000+" -> (15000000, 25000000, True), i.e. open-ended
+    match = RANGE_RE.match(text)
+    if not match:
+        raise ValueError(f"'{text}' is not a 'min-max' range")
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    if low > high:
+        raise ValueError(f"'{text}' has min above max")
+    as_number = lambda v: int(v) if v.is_integer() else v
+    return as_number(low), as_number(high), bool(match.group(3))
+
+
+def parse_years(text):
+    low, high, open_ended = parse_range(text)
+    if not (isinstance(low, int) and isinstance(high, int)) or open_ended:
+        raise ValueError(f"'{text}' is not a 'YYYY-YYYY' year range")
+    if low < YEAR_MIN or high > YEAR_MAX:
+        raise ValueError(f"'{text}' is outside {YEAR_MIN}-{YEAR_MAX}")
+    return low, high
+
+
+def interval_table(mapping):
+    # Splits overlapping year ranges at every boundary and unions the values,
+    # keeping first-seen order; adjacent segments with equal values are merged
+    ranges = [(*parse_years(key), values) for key, values in mapping.items()]
+    bounds = sorted({low for low, _, _ in ranges} | {high + 1 for _, high, _ in ranges})
+    table = []
+    for start, stop in zip(bounds, bounds[1:]):
+        values = []
+        for low, high, items in ranges:
+            if low <= start and stop - 1 <= high:
+                values.extend(v for v in items if v not in values)
+        if not values:
+            continue
+        if table and table[-1][1] == start - 1 and table[-1][2] == values:
+            table[-1][1] = stop - 1
+        else:
+            table.append([start, stop - 1, values])
+    return table
+
+
+def check_fields(obj, schema, where, errors):
+    if not isinstance(obj, dict):
+        errors.append(f"{where}: expected an object")
+        return False
+    before = len(errors)
+    for field, (kind, required) in schema.items():
+        if field not in obj:
+            if required:
+                errors.append(f"{where}.{field}: missing")
+        elif not isinstance(obj[field], kind) or isinstance(obj[field], bool):
+            errors.append(f"{where}.{field}: expected {getattr(kind, '__name__', 'number')}, got {type(obj[field]).__name__}")
+    for field in obj.keys() - schema.keys():
+        errors.append(f"{where}.{field}: unknown field")
+    return len(errors) == before
+
+
+def spawn_sum_warning(rates, where):
+    total = sum(rates)
+    if abs(total - 1) > SPAWN_TOLERANCE:
+        return f"{where}: spawn rates sum to {total:.4f}, not 1 (the bundle stores them normalized)"
+    return None
+
+
+def compile_model(model, where, errors):
+    if not check_fields(model, MODEL_SCHEMA, where, errors):
+        return None
+    compiled = {'code': model['code']}
+    if 'realName' in model:
+        compiled['realName'] = model['realName']
+    compiled['spawnRate'] = model['spawnRate']
+    compiled['segment'] = model['segment']
+    compiled['basePrice'] = model['basePriceTL']
+    try:
+        low, high, open_ended = parse_range(model['priceRange'])
+        compiled['price'] = [low, high]
+        if open_ended:
+            compiled['priceOpenEnded'] = True
+        if not low <= model['basePriceTL'] <= high:
+            errors.append(f"{where}.basePriceTL: {model['basePriceTL']} is outside priceRange {model['priceRange']}")
+    except ValueError as e:
+        errors.append(f"{where}.priceRange: {e}")
+    for field, key in (('engineSizeRange', 'engineSize'), ('horsepowerRange', 'horsepower')):
+        try:
+            low, high, _ = parse_range(model[field])
+            compiled[key] = [low, high]
+        except ValueError as e:
+            errors.append(f"{where}.{field}: {e}")
+    for field in ('bodyTypes', 'fuelTypes'):
+        try:
+            compiled[field] = interval_table(model[field])
+            if not compiled[field]:
+                errors.append(f"{where}.{field}: no year ranges")
+        except ValueError as e:
+            errors.append(f"{where}.{field}: {e}")
+    types = model['transmissions'].get('types')
+    if not isinstance(types, list) or not types or not all(isinstance(t, str) for t in types):
+        errors.append(f"{where}.transmissions.types: expected a non-empty list of strings")
+    compiled['transmissions'] = types
+    compiled['driveType'] = model['driveType']
+    tables = [compiled[f] for f in ('bodyTypes', 'fuelTypes') if compiled.get(f)]
+    if tables:
+        compiled['years'] = [min(t[0][0] for t in tables), max(t[-1][1] for t in tables)]
+    return compiled
+
+
+def compile_brand(name, path):
+    # Returns (compiled brand or None, errors, warnings)
+    errors, warnings = [], []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except ValueError as e:
+        return None, [f"{name}: invalid JSON: {e}"], warnings
+    if not check_fields(data, BRAND_SCHEMA, name, errors):
+        return None, errors, warnings
+
+    models = []
+    codes = set()
+    for i, model in enumerate(data['models']):
+        where = f"{name}.models[{i}]"
+        compiled = compile_model(model, where, errors)
+        if compiled is None:
+            continue
+        if compiled['code'] in codes:
+            errors.append(f"{where}.code: duplicate model '{compiled['code']}'")
+        codes.add(compiled['code'])
+        if compiled['spawnRate'] <= 0:
+            errors.append(f"{where}.spawnRate: must be positive")
+        models.append(compiled)
+    if not models:
+        errors.append(f"{name}.models: empty")
+        return None, errors, warnings
+
+    warning = spawn_sum_warning([m['spawnRate'] for m in models], f"{name}.models")
+    if warning:
+        warnings.append(warning)
+    total = sum(m['spawnRate'] for m in models)
+    for m in models:
+        m['weight'] = round(m['spawnRate'] / total, 6)
+    return {'brand': data['brand'], 'spawnRate': data['spawnRate'], 'models': models}, errors, warnings
+
+
+def compile_all(data_dir=VEHICLE_DATA_DIR):
+    brands, errors, warnings = [], [], []
+    for name, path in discover_configs(data_dir).items():
+        brand, brand_errors, brand_warnings = compile_brand(name, path)
+        errors += brand_errors
+        warnings += brand_warnings
+        if brand:
+            brands.append(brand)
+
+    warning = spawn_sum_warning([b['spawnRate'] for b in brands], "brands")
+    if warning:
+        warnings.append(warning)
+    total = sum(b['spawnRate'] for b in brands) or 1
+    for b in brands:
+        b['weight'] = round(b['spawnRate'] / total, 6)
+    return {'version': BUNDLE_VERSION, 'brands': brands}, errors, warnings
+
+
+def encode(bundle):
+    return json.dumps(bundle, ensure_ascii=False, separators=(',', ':'))
+
+
+def build(data_dir=VEHICLE_DATA_DIR, bundle_path=BUNDLE_PATH, check=False, strict=False):
+    bundle, errors, warnings = compile_all(data_dir)
+    for e in errors:
+        print(f"❌ {e}")
+    for w in warnings:
+        print(f"⚠️  {w}")
+    if errors or (strict and warnings):
+        return 1
+
+    text = encode(bundle)
+    models = sum(len(b['models']) for b in bundle['brands'])
+    if check:
+        try:
+            with open(bundle_path, 'r', encoding='utf-8') as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != text:
+            print(f"❌ {bundle_path} is out of date")
+            return 1
+        print(f"✅ {bundle_path} is up to date ({len(bundle['brands'])} brands, {models} models)")
+        return 0
+
+    with open(bundle_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    source = sum(os.path.getsize(p) for p in discover_configs(data_dir).values())
+    print(f"✅ {len(bundle['brands'])} brands, {models} models -> {bundle_path} "
+          f"({len(text.encode('utf-8'))} bytes, sources {source} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    unknown = [a for a in args if a not in ('--check', '--strict')]
+    if unknown:
+        print("Usage: python3 compile_vehicle_data.py [--check] [--strict]")
+        sys.exit(1)
+    sys.exit(build(check='--check' in args, strict='--strict' in args))
@@ -0,0 +1,286 @@
+import os
+import re
+import sys
+
+# Edits Dart sources by member signature instead of line number. An anchor
+# like 'List<TargetFocus> _createTutorialTargetsPart2()' is located in one
+# pass over the file that skips comments and strings (including nested
+# ${...} interpolation) and tracks brace depth, so the member's end is its
+# balanced closing brace, or the ';' of an '=>' body. Edits are applied by
+# joining slices of the original text, and patch_files() writes every file
+# to a temporary first so either all files change or none do.
+
+
+class Edit:
+    def __init__(self, kind, anchor, text=""):
+        if kind not in ("replace", "insert_before", "insert_after", "delete"):
+            raise ValueError(f"unknown edit kind {kind!r}")
+        self.kind = kind
+        self.anchor = anchor
+        self.text = text
+
+    def __repr__(self):
+        return f"Edit({self.kind}, {self.anchor!r})"
+
+
+def replace(anchor, text):
+    return Edit("replace", anchor, text)
+
+
+def insert_before(anchor, text):
+    return Edit("insert_before", anchor, text)
+
+
+def insert_after(anchor, text):
+    return Edit("insert_after", anchor, text)
+
+
+def delete(anchor):
+    return Edit("delete", anchor)
+
+
+def anchor_pattern(anchor):
+    # Whitespace-insensitive between tokens, but identifiers must stay apart
+    tokens = re.findall(r"\w+|\S", anchor)
+    if not tokens:
+        raise ValueError("empty anchor")
+    parts = [re.escape(tokens[0])]
+    for prev, token in zip(tokens, tokens[1:]):
+        separator = r"\s+" if re.match(r"\w", prev[-1]) and re.match(r"\w", token[0]) else r"\s*"
+        parts.append(separator + re.escape(token))
+    pattern = "".join(parts)
+    if re.match(r"\w", tokens[0]):
+        pattern = r"(?<![\w$])" + pattern
+    if re.match(r"\w", tokens[-1][-1]):
+        pattern += r"(?![\w$])"
+    return pattern
+
+
+_CODE_TOKENS = r"""
+    (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>(?:(?<![\w$])r)?(?:'''|\"\"\"|'|"))
+  | (?P<open>\{)
+  | (?P<close>\})
+  | (?P<paren_open>\()
+  | (?P<paren_close>\))
+  | (?P<arrow>=>)
+  | (?P<semi>;)
+"""
+_BLOCK_COMMENT_RE = re.compile(r"/\*|\*/")
+
+
+def _string_re(quote):
+    # Inside a non-raw string: escapes, interpolation or the closing quote
+    newline = "" if len(quote) == 3 else r"|\n"
+    return re.compile(r"\\.|\$\{|" + re.escape(quote) + newline, re.S)
+
+
+_STRING_RES = {q: _string_re(q) for q in ("'", '"', "'''", '"""')}
+
+
+def locate(source, anchors):
+    # Returns {anchor: (start, end)} where source[start:end] is the member
+    # from the first character of the anchor to its closing '}' or ';'.
+    # Raises ValueError if an anchor is missing, ambiguous or unterminated.
+    # Anchors come first so they win over the '(' tokens they contain
+    alternatives = [f"(?P<anchor{i}>{anchor_pattern(a)})" for i, a in enumerate(anchors)]
+    code_re = re.compile("|".join(alternatives + [_CODE_TOKENS]), re.X)
+
+    found = {}
+    stack = []  # ("brace", anchor index or None) / ("arrow", anchor index) / ("interp", quote)
+    parens = 0
+    pending = None  # (anchor index, brace depth, paren depth) of an anchor waiting for its body
+    pos = 0
+    length = len(source)
+    while pos < length:
+        m = code_re.search(source, pos)
+        if not m:
+            break
+        kind = m.lastgroup
+        pos = m.end()
+
+        if kind.startswith("anchor"):
+            index = int(kind[6:])
+            if index in found:
+                raise ValueError(f"anchor {anchors[index]!r} matches more than once")
+            found[index] = [m.start(), None]
+            # The body starts once the signature's own parentheses are closed again
+            pending = (index, len(stack), parens)
+            parens += m.group().count("(") - m.group().count(")")
+            continue
+        if kind == "line_comment":
+            continue
+        if kind == "block_comment":
+            depth = 1
+            while depth:
+                c = _BLOCK_COMMENT_RE.search(source, pos)
+                if not c:
+                    raise ValueError("unterminated block comment")
+                depth += 1 if c.group() == "/*" else -1
+                pos = c.end()
+            continue
+        if kind == "string":
+            token = m.group()
+            raw = token.startswith("r")
+            quote = token.lstrip("r")
+            pos = _skip_string(source, pos, quote, raw, stack)
+            continue
+        if kind == "paren_open":
+            parens += 1
+        elif kind == "paren_close":
+            parens -= 1
+        elif kind == "open":
+            owner = None
+            if pending and pending[1] == len(stack) and pending[2] == parens:
+                owner, pending = pending[0], None
+            stack.append(("brace", owner))
+        elif kind == "arrow":
+            if pending and pending[1] == len(stack) and pending[2] == parens:
+                stack.append(("arrow", pending[0]))
+                pending = None
+        elif kind == "semi":
+            if stack and stack[-1][0] == "arrow":
+                found[stack.pop()[1]][1] = pos
+            elif pending and pending[1] == len(stack) and pending[2] == parens:
+                # A declaration without a body (abstract member, field)
+                found[pending[0]][1] = pos
+                pending = None
+        elif kind == "close":
+            if not stack:
+                raise ValueError(f"unbalanced '}}' at offset {m.start()}")
+            frame = stack.pop()
+            if frame[0] == "interp":
+                pos = _skip_string(source, pos, frame[1], False, stack)
+            elif frame[0] == "brace" and frame[1] is not None:
+                found[frame[1]][1] = pos
+
+    if stack:
+        raise ValueError(f"{len(stack)} unclosed '{{' at end of file")
+    missing = [anchors[i] for i in range(len(anchors)) if i not in found]
+    if missing:
+        raise ValueError(f"anchor not found: {', '.join(repr(a) for a in missing)}")
+    unterminated = [anchors[i] for i, (_, end) in found.items() if end is None]
+    if unterminated:
+        raise ValueError(f"no end found for: {', '.join(repr(a) for a in unterminated)}")
+    return {anchors[i]: tuple(span) for i, span in found.items()}
+
+
+def _skip_string(source, pos, quote, raw, stack):
+    # Returns the position after the closing quote, or after '${' with an
+    # "interp" frame pushed so the matching '}' resumes this string
+    if raw:
+        end = source.find(quote, pos)
+        if end < 0:
+            raise ValueError("unterminated string")
+        return end + len(quote)
+    string_re = _STRING_RES[quote]
+    while True:
+        s = string_re.search(source, pos)
+        if not s or s.group() == "\n":
+            raise ValueError(f"unterminated string at offset {pos}")
+        pos = s.end()
+        if s.group() == "${":
+            stack.append(("interp", quote))
+            return pos
+        if s.group() == quote:
+            return pos
+
+
+def _member_span(source, start, end, with_docs=True):
+    # Widens (start, end) to whole lines: the declaration line from its
+    # indentation, doc comments and annotations above it, and the newline
+    # after the closing brace
+    line_start = source.rfind("\n", 0, start) + 1
+    if not re.search(r"[;{}]", source[line_start:start]):
+        start = line_start
+        while with_docs and start > 0:
+            prev_start = source.rfind("\n", 0, start - 1) + 1
+            prev = source[prev_start:start].strip()
+            if prev.startswith("///") or prev.startswith("@"):
+                start = prev_start
+            else:
+                break
+    if source.startswith("\n", end):
+        end += 1
+    return start, end
+
+
+def apply(source, edits):
+    # Returns the patched source; all anchors are located in one pass over
+    # the original text and the edits may not overlap
+    if not edits:
+        return source
+    spans = locate(source, list(dict.fromkeys(e.anchor for e in edits)))
+    pieces = []
+    for edit in edits:
+        start, end = _member_span(source, *spans[edit.anchor])
+        text = edit.text if edit.text.endswith("\n") or not edit.text else edit.text + "\n"
+        if edit.kind == "replace":
+            pieces.append((start, end, text))
+        elif edit.kind == "delete":
+            pieces.append((start, end, ""))
+        elif edit.kind == "insert_before":
+            pieces.append((start, start, text))
+        else:
+            pieces.append((end, end, text))
+
+    pieces.sort(key=lambda p: (p[0], p[1]))
+    out = []
+    cursor = 0
+    for start, end, text in pieces:
+        if start < cursor:
+            raise ValueError("edits overlap")
+        out.append(source[cursor:start])
+        out.append(text)
+        cursor = end
+    out.append(source[cursor:])
+    return "".join(out)
+
+
+def patch_files(edits_by_file, dry_run=False):
+    # {path: [Edit, ...]} -> {path: changed?}. Nothing is written unless
+    # every file patches cleanly; temporaries are then renamed into place.
+    results = {}
+    staged = []
+    try:
+        for path, edits in edits_by_file.items():
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                source = f.read()
+            try:
+                patched = apply(source, edits)
+            except ValueError as e:
+                raise ValueError(f"{path}: {e}") from None
+            results[path] = patched != source
+            if results[path] and not dry_run:
+                tmp_path = path + ".patch.tmp"
+                with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                    f.write(patched)
+                staged.append((tmp_path, path))
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+        staged = []
+    finally:
+        for tmp_path, _ in staged:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return results
+
+
+if __name__ == "__main__":
+    # Debug helper: show where anchors resolve in a file
+    if len(sys.argv) < 3:
+        print("Usage: python3 dart_patch.py FILE ANCHOR [ANCHOR ...]")
+        sys.exit(1)
+    path, anchors = sys.argv[1], sys.argv[2:]
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    try:
+        spans = locate(source, anchors)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for anchor, (start, end) in spans.items():
+        first = source.count("\n", 0, start) + 1
+        last = source.count("\n", 0, end - 1) + 1
+        print(f"{anchor}: lines {first}-{last}")
@@ -0,0 +1,230 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from asset_manifest import file_hash
+
+# Finds duplicate and near-duplicate car renders. Each image gets a 64-bit
+# DCT perceptual hash (pHash) of its render flattened onto white; hashes
+# within --distance bits of each other are looked up through a BK-tree, so
+# the search stays well under the n^2 pairwise comparisons. The hash is
+# grey-scale and every model comes in six colours that share a silhouette,
+# so each candidate pair is confirmed on a small colour thumbnail of the
+# trimmed car before it counts. Groups are reported with the bytes that
+# keeping only one file per group would save.
+
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_DISTANCE = 10
+DEFAULT_MAX_DIFF = 4.0
+HASH_SIZE = 8
+SAMPLE_SIZE = 32
+THUMB_SIZE = (64, 40)
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    m[0] /= np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+
+DCT = _dct_matrix(SAMPLE_SIZE)
+
+
+def flatten(img):
+    # Transparent areas count as white so cut-outs hash like their renders
+    rgba = img.convert("RGBA")
+    background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+    background.alpha_composite(rgba)
+    return background.convert("RGB")
+
+
+def phash(img):
+    # Low-frequency 8x8 corner of the 32x32 DCT, thresholded at its median
+    small = np.asarray(flatten(img).convert("L").resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.LANCZOS), dtype=np.float64)
+    coefficients = (DCT @ small @ DCT.T)[:HASH_SIZE, :HASH_SIZE].ravel()
+    bits = coefficients > np.median(coefficients[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def colour_thumbnail(img):
+    # The car cropped to its alpha box, so canvas padding doesn't dilute the colours
+    if img.mode == "RGBA":
+        box = img.getchannel("A").getbbox()
+        if box:
+            img = img.crop(box)
+    return np.asarray(flatten(img).resize(THUMB_SIZE, Image.BOX))
+
+
+def colour_diff(a, b):
+    return float(np.abs(a.astype(np.int16) - b).mean())
+
+
+def hash_file(path):
+    try:
+        with Image.open(path) as img:
+            img.load()
+            return path, (phash(img), colour_thumbnail(img), img.size, os.path.getsize(path), file_hash(path)), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    # Metric tree over Hamming distance: a node's children are keyed by their
+    # distance to it, and the triangle inequality prunes every subtree whose
+    # key is outside [d - radius, d + radius]
+    def __init__(self):
+        self.root = None
+        self.comparisons = 0
+
+    def add(self, value, item):
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value, radius):
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, items, children = stack.pop()
+            d = hamming(value, node_value)
+            self.comparisons += 1
+            if d <= radius:
+                found.extend((d, item) for item in items)
+            for key, child in children.items():
+                if d - radius <= key <= d + radius:
+                    stack.append(child)
+        return found
+
+
+def group_duplicates(entries, distance, max_diff):
+    # entries: [(path, hash, thumbnail, size, bytes, sha256)]; returns
+    # (groups, comparisons) with groups as lists of entry indices
+    parent = list(range(len(entries)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    tree = BKTree()
+    for i, entry in enumerate(entries):
+        for _, j in tree.search(entry[1], distance):
+            if colour_diff(entry[2], entries[j][2]) <= max_diff:
+                parent[find(i)] = find(j)
+        tree.add(entry[1], i)
+
+    groups = {}
+    for i in range(len(entries)):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1], tree.comparisons
+
+
+def group_duplicates_pairwise(entries, distance, max_diff):
+    # O(n^2) reference for --benchmark
+    parent = list(range(len(entries)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i in range(len(entries)):
+        for j in range(i):
+            if (hamming(entries[i][1], entries[j][1]) <= distance
+                    and colour_diff(entries[i][2], entries[j][2]) <= max_diff):
+                parent[find(i)] = find(j)
+    groups = {}
+    for i in range(len(entries)):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def find_images(root):
+    return sorted(
+        os.path.join(dirpath, f)
+        for dirpath, _, filenames in os.walk(root)
+        for f in filenames if f.lower().endswith(".png")
+    )
+
+
+def report(root=DEFAULT_ROOT, distance=DEFAULT_DISTANCE, max_diff=DEFAULT_MAX_DIFF, workers=None, benchmark=False):
+    paths = find_images(root)
+    start = time.perf_counter()
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, entry, error in pool.map(hash_file, paths, chunksize=8):
+            if error:
+                print(f"Error hashing {path}: {error}")
+                continue
+            entries.append((path, *entry))
+    hashed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups, comparisons = group_duplicates(entries, distance, max_diff)
+    searched = time.perf_counter() - start
+    pairs = len(entries) * (len(entries) - 1) // 2
+    print(f"Hashed {len(entries)} images in {hashed:.2f}s; grouped in {searched * 1000:.1f}ms "
+          f"with {comparisons} hash comparisons ({pairs} pairwise)")
+
+    reclaimable = 0
+    exact_reclaimable = 0
+    # Keep the largest render of each group, ties broken by path
+    groups.sort(key=lambda g: -sum(entries[i][4] for i in g))
+    for group in groups:
+        members = sorted(group, key=lambda i: (-entries[i][3][0] * entries[i][3][1], entries[i][0]))
+        keep = members[0]
+        print(f"\n{entries[keep][0]}  {entries[keep][3][0]}x{entries[keep][3][1]}  (kept)")
+        for i in members[1:]:
+            path, value, thumbnail, (w, h), nbytes, digest = entries[i]
+            exact = digest == entries[keep][5]
+            kind = "identical file" if exact else (f"{hamming(value, entries[keep][1])} bits apart, "
+                                                   f"colour diff {colour_diff(thumbnail, entries[keep][2]):.1f}")
+            print(f"  {path}  {w}x{h}  {nbytes / 1e3:.0f} KB  {kind}")
+            reclaimable += nbytes
+            if exact:
+                exact_reclaimable += nbytes
+
+    total = sum(e[4] for e in entries)
+    print(f"\n{len(groups)} groups; deduplicating would reclaim {reclaimable / 1e6:.2f} MB of {total / 1e6:.2f} MB "
+          f"({exact_reclaimable / 1e6:.2f} MB from byte-identical files)")
+
+    if benchmark:
+        start = time.perf_counter()
+        reference = group_duplicates_pairwise(entries, distance, max_diff)
+        pairwise = time.perf_counter() - start
+        same = sorted(map(sorted, reference)) == sorted(map(sorted, groups))
+        print(f"Pairwise: {pairwise * 1000:.1f}ms, BK-tree: {searched * 1000:.1f}ms, same groups: {same}")
+    return len(groups)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate images by perceptual hash.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-d", "--distance", type=int, default=DEFAULT_DISTANCE,
+                        help="max differing hash bits (of 64) for a candidate pair (default: %(default)s)")
+    parser.add_argument("--max-diff", type=float, default=DEFAULT_MAX_DIFF,
+                        help="max mean colour difference (0-255) to confirm a candidate (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--benchmark", action="store_true", help="also run the pairwise search and compare")
+    args = parser.parse_args()
+    sys.exit(1 if report(args.root, args.distance, args.max_diff, args.workers, args.benchmark) else 0)
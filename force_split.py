@@ -1,31 +1,59 @@
 from PIL import Image
+from asset_manifest import AssetManifest
+import argparse
 import sys
 import os
 
-def force_split(image_path):
+TOOL_NAME = "force_split"
+TRIM = 15  # Reduced trim to 15 pixels to balance artifact removal and preserving car body
+
+
+def split_outputs(image_path):
+    base_name = os.path.splitext(image_path)[0]
+    return f"{base_name}_top.png", f"{base_name}_bottom.png"
+
+
+def split_boxes(width, height, trim=TRIM):
+    # (top, bottom) crop boxes; split_grid.py uses these as its regression baseline
+    mid_point = height // 2
+    return (0, 0, width, mid_point - trim), (0, mid_point + trim, width, height)
+
+
+def force_split(image_path, manifest=None, force=False):
+    params = {"trim": TRIM}
+    if manifest and not force and manifest.is_up_to_date(TOOL_NAME, image_path, params):
+        print(f"Skipping {image_path} (up to date)")
+        return
+
     try:
         img = Image.open(image_path)
     except Exception as e:
         print(f"Error: Could not read {image_path}: {e}")
         return
 
-    width, height = img.size
-    mid_point = height // 2
-    trim = 15  # Reduced trim to 15 pixels to balance artifact removal and preserving car body
-
-    # Top half
-    top_img = img.crop((0, 0, width, mid_point - trim))
-    # Bottom half
-    bottom_img = img.crop((0, mid_point + trim, width, height))
+    top_box, bottom_box = split_boxes(*img.size)
+    top_img = img.crop(top_box)
+    bottom_img = img.crop(bottom_box)
 
-    base_name = os.path.splitext(image_path)[0]
-    
-    top_img.save(f"{base_name}_top.png")
-    bottom_img.save(f"{base_name}_bottom.png")
+    top_path, bottom_path = split_outputs(image_path)
+    top_img.save(top_path)
+    bottom_img.save(bottom_path)
+    if manifest:
+        manifest.record(TOOL_NAME, image_path, params, outputs=[top_path, bottom_path])
     print(f"Split {image_path} into top and bottom halves.")
 
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python force_split.py <image_path>")
-    else:
-        force_split(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Split an image into top and bottom halves.")
+    parser.add_argument("image_paths", nargs="*", metavar="image_path")
+    parser.add_argument("-f", "--force", action="store_true", help="resplit images the manifest says are done")
+    args = parser.parse_args()
+
+    if not args.image_paths:
+        print("Usage: python force_split.py <image_path> [...] [-f]")
+        sys.exit(1)
+
+    with AssetManifest() as manifest:
+        manifest.remove_stale(TOOL_NAME)
+        for path in args.image_paths:
+            force_split(path, manifest, args.force)
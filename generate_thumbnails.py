@@ -0,0 +1,186 @@
+from PIL import Image
+from asset_manifest import AssetManifest, file_hash
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from normalize_assets import crop_center
+import argparse
+import json
+import os
+import time
+
+# 1x/2x/3x thumbnails of the car images for list tiles, so a row decodes a
+# few hundred KB instead of the full render. Every source is center-cropped
+# to the tile ratio and scaled down (never up). Output follows Flutter's
+# resolution-aware layout, <dir>/<name>.png, <dir>/2.0x/<name>.png, ...,
+# and thumbnails.json maps each source hash to its variants and sizes.
+
+TOOL_NAME = "generate_thumbnails"
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_OUT = "build/thumbnails"
+INDEX_NAME = "thumbnails.json"
+INDEX_VERSION = 1
+# Logical tile box; the car renders are ~3:2, so this keeps the whole car
+# inside the 120 px wide tile in vehicle_list_screen.dart
+DEFAULT_WIDTH = 120
+DEFAULT_HEIGHT = 80
+SCALES = (1, 2, 3)
+
+
+def variant_path(out_dir, root, path, scale):
+    rel_dir, name = os.path.split(os.path.relpath(path, root))
+    if scale == 1:
+        return os.path.join(out_dir, rel_dir, name)
+    return os.path.join(out_dir, rel_dir, f"{scale:.1f}x", name)
+
+
+def thumbnail_file(path, root, out_dir, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, scales=SCALES, dry_run=False):
+    try:
+        source_bytes = os.path.getsize(path)
+        with Image.open(path) as img:
+            img.load()
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            cropped = crop_center(img, width / height)
+
+            variants = {}
+            for scale in scales:
+                size = (width * scale, height * scale)
+                if size[0] > cropped.width:
+                    # Not enough pixels for this density; Flutter falls back to the next lower one
+                    continue
+                thumb = cropped.resize(size, Image.LANCZOS)
+                out_path = variant_path(out_dir, root, path, scale)
+                if not dry_run:
+                    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                    thumb.save(out_path, optimize=True)
+                    out_bytes = os.path.getsize(out_path)
+                else:
+                    out_bytes = None
+                variants[f"{scale}x"] = {
+                    "path": os.path.relpath(out_path, out_dir).replace(os.sep, "/"),
+                    "width": size[0],
+                    "height": size[1],
+                    "bytes": out_bytes,
+                    "decoded_bytes": size[0] * size[1] * 4,
+                }
+        return {
+            "path": path,
+            "hash": file_hash(path),
+            "source": os.path.relpath(path, root).replace(os.sep, "/"),
+            "bytes": source_bytes,
+            "decoded_bytes": img.width * img.height * 4,
+            "variants": variants,
+        }
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def load_index(out_dir):
+    try:
+        with open(os.path.join(out_dir, INDEX_NAME), "r") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_index(out_dir, index):
+    path = os.path.join(out_dir, INDEX_NAME)
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def generate(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT,
+             scales=SCALES, workers=None, force=False, dry_run=False):
+    paths = sorted(
+        os.path.join(dirpath, f)
+        for dirpath, _, filenames in os.walk(root)
+        for f in filenames if f.lower().endswith(".png")
+    )
+    params = {"width": width, "height": height, "scales": list(scales), "out_dir": out_dir}
+
+    previous = load_index(out_dir)
+    if previous.get("tile") != [width, height]:
+        previous = {}
+    known = {entry["source"]: (digest, entry) for digest, entry in previous.get("images", {}).items()}
+
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    pending = paths
+    if not force and not dry_run:
+        pending = [
+            p for p in paths
+            if os.path.relpath(p, root).replace(os.sep, "/") not in known
+            or not manifest.is_up_to_date(TOOL_NAME, p, params)
+        ]
+        print(f"{len(paths) - len(pending)} of {len(paths)} images already up to date")
+
+    start = time.perf_counter()
+    results = {}
+    job = partial(thumbnail_file, root=root, out_dir=out_dir, width=width, height=height,
+                  scales=scales, dry_run=dry_run)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(job, pending, chunksize=4):
+            if "error" in result:
+                print(f"Error processing {result['path']}: {result['error']}")
+                continue
+            if not dry_run:
+                outputs = [os.path.join(out_dir, v["path"]) for v in result["variants"].values()]
+                manifest.record(TOOL_NAME, result["path"], params, outputs=outputs)
+            results[result["source"]] = result
+    print(f"Generated thumbnails for {len(results)} images in {time.perf_counter() - start:.2f}s")
+
+    # Unchanged sources keep their previous entries; identical files share one
+    images = {}
+    for path in paths:
+        source = os.path.relpath(path, root).replace(os.sep, "/")
+        if source in results:
+            r = results[source]
+            digest = r["hash"]
+            entry = {k: r[k] for k in ("source", "bytes", "decoded_bytes", "variants")}
+        elif source in known:
+            digest, entry = known[source]
+        else:
+            continue
+        images.setdefault(digest, entry)
+
+    if not dry_run:
+        save_index(out_dir, {"version": INDEX_VERSION, "tile": [width, height], "scales": list(scales), "images": images})
+    print_report(images.values(), scales)
+
+
+def print_report(entries, scales):
+    entries = list(entries)
+    if not entries:
+        return
+    source = sum(e["bytes"] for e in entries)
+    decoded = sum(e["decoded_bytes"] for e in entries)
+    print(f"\n{len(entries)} unique sources: {source / 1e6:.2f} MB on disk, {decoded / 1e6:.2f} MB decoded")
+    for scale in scales:
+        key = f"{scale}x"
+        variants = [e["variants"][key] for e in entries if key in e["variants"]]
+        if not variants:
+            continue
+        on_disk = sum(v["bytes"] or 0 for v in variants)
+        per_row = sum(v["decoded_bytes"] for v in variants) / len(variants)
+        print(f"{key}: {len(variants)} files, {on_disk / 1e6:.2f} MB on disk, "
+              f"{per_row / 1e3:.0f} KB decoded per row (full size: {decoded / len(entries) / 1e3:.0f} KB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build 1x/2x/3x list thumbnails of the car images.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT, help="where thumbnails are written (mirrors root)")
+    parser.add_argument("--size", default=f"{DEFAULT_WIDTH}x{DEFAULT_HEIGHT}", help="logical tile size WxH (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="regenerate thumbnails the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report sizes, write nothing")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    generate(args.root, args.out_dir, width, height, SCALES, args.workers, args.force, args.dry_run)
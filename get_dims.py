@@ -1,13 +1,225 @@
+import argparse
+import json
 import os
-from PIL import Image
+import statistics
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bmp_io import HEADER_SIZE as BMP_HEADER_SIZE
 
-path = '/Users/selimyay/cebinden/assets/car_images/bavora/bavora.png'
-if os.path.exists(path):
+# Dimensions, mode, alpha and size of every image under assets/, read from
+# the file headers only (PNG IHDR/tRNS, BMP info header, JPEG SOF) so no
+# pixels are decoded. Results are cached by size and mtime, and outliers
+# are flagged: aspect ratio off from the rest of the model, oversized files,
+# car images without alpha, files whose content doesn't match the extension.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.join(ROOT, 'assets')
+CACHE_PATH = os.path.join(ROOT, '.image_index.json')
+CACHE_VERSION = 2
+EXTENSIONS = ('.png', '.bmp', '.jpg', '.jpeg')
+
+MAX_SIDE = 2048
+MAX_BYTES = 2 * 1024 * 1024
+RATIO_TOLERANCE = 0.05  # Relative difference from the folder's median ratio
+ALPHA_REQUIRED = ('car_images',)  # Folders whose images are composited over the UI
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+
+def read_png(f):
+    header = f.read(33)
+    if len(header) < 33 or header[:8] != PNG_SIGNATURE or header[12:16] != b'IHDR':
+        raise ValueError("not a PNG file")
+    width, height, depth, colour = struct.unpack('>IIBB', header[16:26])
+    mode = PNG_MODES.get(colour, f'type{colour}')
+    if depth == 16 and colour == 0:
+        mode = 'I;16'
+    alpha = colour in (4, 6)
+    if not alpha:
+        # A tRNS chunk before the pixel data makes palette/RGB/grey images transparent
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            length, kind = struct.unpack('>I4s', chunk)
+            if kind == b'tRNS':
+                alpha = True
+                break
+            if kind in (b'IDAT', b'IEND'):
+                break
+            f.seek(length + 4, os.SEEK_CUR)  # Skip data and CRC
+    return width, height, mode, alpha
+
+
+def read_bmp(f):
+    header = f.read(BMP_HEADER_SIZE)
+    if len(header) < 30 or header[:2] != b'BM':
+        raise ValueError("not a BMP file")
+    width, height = struct.unpack('<ii', header[18:26])
+    bpp = struct.unpack('<H', header[28:30])[0]
+    mode = {32: 'BGRA', 24: 'BGR', 8: 'P', 1: '1'}.get(bpp, f'{bpp}bpp')
+    return abs(width), abs(height), mode, bpp == 32
+
+
+def read_jpeg(f):
+    if f.read(2) != b'\xff\xd8':
+        raise ValueError("not a JPEG file")
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError("no frame header")
+        length = struct.unpack('>H', f.read(2))[0]
+        # SOF0..SOF15 except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            _, height, width, components = struct.unpack('>BHHB', f.read(6))
+            return width, height, {1: 'L', 3: 'RGB', 4: 'CMYK'}.get(components, f'{components}ch'), False
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+# Picked by signature, not extension: some .png files are really JPEGs
+READERS = ((PNG_SIGNATURE, 'png', read_png), (b'BM', 'bmp', read_bmp), (b'\xff\xd8', 'jpeg', read_jpeg))
+
+
+def read_header(path):
     try:
-        with Image.open(path) as img:
-            print(f"Dimensions: {img.size}")
-            print(f"Format: {img.format}")
-    except Exception as e:
-        print(f"Error: {e}")
-else:
-    print("File not found")
+        with open(path, 'rb') as f:
+            magic = f.read(8)
+            f.seek(0)
+            for signature, fmt, reader in READERS:
+                if magic.startswith(signature):
+                    width, height, mode, alpha = reader(f)
+                    return {'width': width, 'height': height, 'mode': mode, 'alpha': alpha, 'format': fmt}
+        raise ValueError("unknown image format")
+    except (OSError, ValueError, struct.error) as e:
+        return {'error': str(e) or type(e).__name__}
+
+
+def image_files(roots):
+    for root in roots:
+        if os.path.isfile(root):
+            yield root
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for name in sorted(filenames):
+                if name.lower().endswith(EXTENSIONS):
+                    yield os.path.join(dirpath, name)
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(files, path=CACHE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def build_index(roots=(DEFAULT_ROOT,), use_cache=True, workers=16):
+    cached = load_cache() if use_cache else {}
+    index = {}
+    stale = []
+    for path in image_files(roots):
+        rel = os.path.relpath(os.path.abspath(path), ROOT).replace(os.sep, '/')
+        st = os.stat(path)
+        entry = cached.get(rel)
+        if entry and entry['bytes'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            index[rel] = entry
+        else:
+            stale.append((rel, path, st))
+
+    # Header reads are tiny and I/O bound, so threads are enough
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (rel, _, st), info in zip(stale, pool.map(read_header, [p for _, p, _ in stale])):
+            index[rel] = {**info, 'bytes': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    if use_cache:
+        # Entries outside this scan stay while their file exists (a run on one
+        # folder keeps the rest); deleted or renamed files drop out
+        kept = {
+            rel: entry for rel, entry in cached.items()
+            if rel not in index and os.path.exists(os.path.join(ROOT, rel))
+        }
+        if stale or len(kept) + len(index) != len(cached):
+            save_cache({**kept, **index})
+    return dict(sorted(index.items())), len(stale)
+
+
+def find_outliers(index):
+    # Returns {path: [reason, ...]}
+    flagged = {}
+    by_folder = {}
+    for rel, entry in index.items():
+        if 'error' in entry:
+            flagged.setdefault(rel, []).append(f"unreadable: {entry['error']}")
+            continue
+        by_folder.setdefault(os.path.dirname(rel), []).append(rel)
+        extension = os.path.splitext(rel)[1].lower().lstrip('.').replace('jpg', 'jpeg')
+        if extension != entry['format']:
+            flagged.setdefault(rel, []).append(f"{entry['format'].upper()} data in a .{extension} file")
+        if max(entry['width'], entry['height']) > MAX_SIDE:
+            flagged.setdefault(rel, []).append(f"oversized: {entry['width']}x{entry['height']} (max side {MAX_SIDE})")
+        if entry['bytes'] > MAX_BYTES:
+            flagged.setdefault(rel, []).append(f"large file: {entry['bytes'] / 1e6:.1f} MB")
+        if not entry['alpha'] and any(f'/{folder}/' in f'/{rel}' for folder in ALPHA_REQUIRED):
+            flagged.setdefault(rel, []).append(f"no alpha ({entry['mode']})")
+
+    for folder, members in by_folder.items():
+        if len(members) < 3:
+            continue
+        median = statistics.median(index[rel]['width'] / index[rel]['height'] for rel in members)
+        for rel in members:
+            ratio = index[rel]['width'] / index[rel]['height']
+            if abs(ratio - median) / median > RATIO_TOLERANCE:
+                flagged.setdefault(rel, []).append(f"aspect ratio {ratio:.3f}, folder median {median:.3f}")
+    return dict(sorted(flagged.items()))
+
+
+def report(roots=(DEFAULT_ROOT,), use_cache=True, workers=16):
+    start = time.perf_counter()
+    index, read = build_index(roots, use_cache, workers)
+    elapsed = time.perf_counter() - start
+    total = sum(e['bytes'] for e in index.values())
+    decoded = sum(e['width'] * e['height'] * 4 for e in index.values() if 'error' not in e)
+    print(f"Indexed {len(index)} images ({read} headers read, rest cached) in {elapsed * 1000:.0f}ms: "
+          f"{total / 1e6:.1f} MB on disk, {decoded / 1e6:.1f} MB decoded as RGBA")
+
+    outliers = find_outliers(index)
+    print(f"\n{len(outliers)} outliers")
+    for rel, reasons in outliers.items():
+        e = index[rel]
+        size = f"{e['width']}x{e['height']} {e['mode']}" if 'error' not in e else ""
+        print(f"  {rel}  {size}")
+        for reason in reasons:
+            print(f"    - {reason}")
+    return len(outliers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index image dimensions from file headers and flag outliers.")
+    parser.add_argument("paths", nargs="*", help="files or folders (default: assets/); a single file just prints its header")
+    parser.add_argument("--no-cache", action="store_true", help="read every header again")
+    parser.add_argument("-j", "--workers", type=int, default=16, help="reader threads (default: %(default)s)")
+    args = parser.parse_args()
+
+    if len(args.paths) == 1 and os.path.isfile(args.paths[0]):
+        info = read_header(args.paths[0])
+        if 'error' in info:
+            print(f"Error: {info['error']}")
+            sys.exit(1)
+        print(f"Dimensions: {(info['width'], info['height'])}")
+        print(f"Mode: {info['mode']}, alpha: {'yes' if info['alpha'] else 'no'}")
+        print(f"Bytes: {os.path.getsize(args.paths[0])}")
+    else:
+        report(args.paths or (DEFAULT_ROOT,), not args.no_cache, args.workers)
@@ -86,15 +86,42 @@ class LocalizationService {
   /// Dil dosyasını yükle
   Future<void> _loadLanguageFile(String languageCode) async {
     try {
+      // build_locale_bundles.py çıktısı: assets/lang/ dosyalarının düzleştirilmiş hali
       String jsonString = await rootBundle.loadString(
-        'assets/lang/$languageCode.json',
+        'assets/lang_bundle/$languageCode.json',
       );
-      _localizedStrings = json.decode(jsonString);
+      _localizedStrings = _unpackBundle(json.decode(jsonString));
     } catch (e) {
       _localizedStrings = {};
     }
   }
 
+  static final RegExp _frontCodedKey = RegExp(r'^(\d+):(.*)$', dotAll: true);
+
+  /// Paketi düz "auth.login" -> değer haritasına aç.
+  /// {"k": [anahtarlar], "v": [değerler]}: "2:title" önceki anahtarın ilk iki
+  /// parçası + ".title" demek; int değer, aynı değerin ilk geçtiği sıra.
+  static Map<String, dynamic> _unpackBundle(Map<String, dynamic> bundle) {
+    final List<dynamic> keys = bundle['k'];
+    final List<dynamic> values = bundle['v'];
+    final Map<String, dynamic> strings = {};
+    List<String> previous = const [];
+
+    for (int i = 0; i < keys.length; i++) {
+      String key = keys[i];
+      final match = _frontCodedKey.firstMatch(key);
+      if (match != null) {
+        final shared = int.parse(match.group(1)!);
+        key = [...previous.take(shared), match.group(2)!].join('.');
+      }
+      previous = key.split('.');
+
+      final value = values[i];
+      strings[key] = value is int ? values[value] : value;
+    }
+    return strings;
+  }
+
   /// Dili değiştir
   Future<bool> changeLanguage(String languageCode) async {
     if (!supportedLanguages.contains(languageCode)) {
@@ -118,23 +145,12 @@ class LocalizationService {
 
   /// Çeviri al - Noktalı path ile (örn: "auth.login")
   String translate(String key, {String? defaultValue}) {
-    try {
-      List<String> keys = key.split('.');
-      dynamic value = _localizedStrings;
-
-      for (String k in keys) {
-        if (value is Map<String, dynamic> && value.containsKey(k)) {
-          value = value[k];
-        } else {
-          // Key bulunamazsa varsa default value, yoksa key'in kendisini döndür
-          return defaultValue ?? key;
-        }
-      }
-
-      return value.toString();
-    } catch (e) {
+    final value = _localizedStrings[key];
+    if (value == null) {
+      // Key bulunamazsa varsa default value, yoksa key'in kendisini döndür
       return defaultValue ?? key;
     }
+    return value.toString();
   }
 
   /// Parametreli çeviri (örn: "Hello {name}" → "Hello John")
@@ -154,25 +170,11 @@ class LocalizationService {
 
   /// Liste çevirisi al (örn: "models.descriptions.Renauva.Slim")
   List<String> translateList(String key) {
-    try {
-      List<String> keys = key.split('.');
-      dynamic value = _localizedStrings;
-
-      for (String k in keys) {
-        if (value is Map<String, dynamic> && value.containsKey(k)) {
-          value = value[k];
-        } else {
-          return [];
-        }
-      }
-
-      if (value is List) {
-        return value.map((e) => e.toString()).toList();
-      }
-      return [];
-    } catch (e) {
-      return [];
+    final value = _localizedStrings[key];
+    if (value is List) {
+      return value.map((e) => e.toString()).toList();
     }
+    return [];
   }
 }
 
@@ -1,49 +1,120 @@
 from PIL import Image
+from asset_manifest import AssetManifest
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from functools import partial
+import argparse
+import glob
 import os
+import sys
+import time
 
-def crop_center(img, target_ratio):
-    width, height = img.size
+TOOL_NAME = "normalize_assets"
+DEFAULT_ROOT = "assets/car_images"
+# Target Ratio: 120 / 140 = 0.857 (the vehicle tile in vehicle_list_screen.dart)
+DEFAULT_RATIO = 120 / 140
+
+def crop_box(size, target_ratio):
+    width, height = size
     current_ratio = width / height
-    
+
     if current_ratio > target_ratio:
         # Too wide, crop width
         new_width = int(height * target_ratio)
         left = (width - new_width) // 2
-        img = img.crop((left, 0, left + new_width, height))
+        return (left, 0, left + new_width, height)
     else:
         # Too tall, crop height
         new_height = int(width / target_ratio)
         top = (height - new_height) // 2
-        img = img.crop((0, top, width, top + new_height))
-        
-    return img
-
-def normalize():
-    base_dir = 'assets/car_images/Renauva'
-    car_path = os.path.join(base_dir, 'Slim.png')
-    mask_path = os.path.join(base_dir, 'Slim_mask.png')
-    
-    if not os.path.exists(car_path) or not os.path.exists(mask_path):
-        print("Files not found!")
-        return
-
-    car = Image.open(car_path)
-    mask = Image.open(mask_path)
-    
-    # Target Ratio: 120 / 140 = 0.857
-    target_ratio = 120 / 140
-    
-    car_fixed = crop_center(car, target_ratio)
-    mask_fixed = crop_center(mask, target_ratio)
-    
-    # Resize to a standard high resolution (e.g., 600x700) to keep quality but fix ratio
-    # Or just keep the cropped size. Let's keep cropped size to avoid interpolation artifacts.
-    
-    car_fixed.save(os.path.join(base_dir, 'Slim_fixed.png'))
-    mask_fixed.save(os.path.join(base_dir, 'Slim_mask_fixed.png'))
-    
-    print(f"Saved Slim_fixed.png: {car_fixed.size}")
-    print(f"Saved Slim_mask_fixed.png: {mask_fixed.size}")
+        return (0, top, width, top + new_height)
+
+def crop_center(img, target_ratio):
+    return img.crop(crop_box(img.size, target_ratio))
+
+def fixed_path(path):
+    return os.path.splitext(path)[0] + "_fixed.png"
+
+def find_pairs(root):
+    # Every *_mask*.png next to its image (Slim_mask.png -> Slim.png). A mask
+    # aligned by register_mask.py is used in place of the raw one.
+    pairs = []
+    for mask_path in sorted(glob.glob(os.path.join(root, "**", "*_mask*.png"), recursive=True)):
+        name = os.path.basename(mask_path)
+        if "_fixed" in name or "_aligned" in name:
+            continue
+        directory = os.path.dirname(mask_path)
+        image_path = os.path.join(directory, name.replace("_mask", "", 1))
+        if not os.path.exists(image_path):
+            print(f"Skipping {mask_path}: no {os.path.basename(image_path)} next to it")
+            continue
+        aligned = os.path.splitext(mask_path)[0] + "_aligned.png"
+        source = aligned if os.path.exists(aligned) else mask_path
+        pairs.append((image_path, source, fixed_path(image_path), fixed_path(mask_path)))
+    return pairs
+
+def normalize_pair(pair, target_ratio=DEFAULT_RATIO, dry_run=False):
+    image_path, mask_path, image_out, mask_out = pair
+    try:
+        with Image.open(image_path) as car, Image.open(mask_path) as mask:
+            if car.size != mask.size:
+                raise ValueError(f"mask is {mask.size[0]}x{mask.size[1]} but the image is "
+                                 f"{car.size[0]}x{car.size[1]}; run register_mask.py first")
+            # One box for both so the mask stays on top of the paint
+            box = crop_box(car.size, target_ratio)
+            if not dry_run:
+                # Keep the cropped size to avoid interpolation artifacts
+                car.crop(box).save(image_out)
+                mask.crop(box).save(mask_out)
+        return pair, box, None
+    except Exception as e:
+        return pair, None, str(e)
+
+def normalize(root=DEFAULT_ROOT, target_ratio=DEFAULT_RATIO, workers=None, force=False, dry_run=False):
+    pairs = find_pairs(root)
+    if not pairs:
+        print("No image/mask pairs found.")
+        return 0
+
+    params = {"target_ratio": target_ratio}
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    if not force:
+        pending = [
+            p for p in pairs
+            if not all(manifest.is_up_to_date(TOOL_NAME, src, {**params, "pair": p[:2]}) for src in p[:2])
+        ]
+        print(f"{len(pairs) - len(pending)} of {len(pairs)} pairs already up to date")
+        pairs = pending
+
+    start = time.perf_counter()
+    failures = 0
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for pair, box, error in pool.map(partial(normalize_pair, target_ratio=target_ratio, dry_run=dry_run), pairs):
+            image_path, mask_path, image_out, mask_out = pair
+            if error:
+                failures += 1
+                print(f"Error normalizing {image_path}: {error}")
+                continue
+            left, top, right, bottom = box
+            print(f"{image_out}, {os.path.basename(mask_out)}: crop {left},{top} {right - left}x{bottom - top}")
+            if not dry_run:
+                pair_params = {**params, "pair": [image_path, mask_path]}
+                manifest.record(TOOL_NAME, image_path, pair_params, outputs=[image_out])
+                manifest.record(TOOL_NAME, mask_path, pair_params, outputs=[mask_out])
+    print(f"Normalized {len(pairs) - failures} pairs in {time.perf_counter() - start:.2f}s")
+    return failures
+
+def parse_ratio(text):
+    # "120/140", "6:7" or "0.857"
+    return float(Fraction(text.replace(":", "/")))
 
 if __name__ == "__main__":
-    normalize()
+    parser = argparse.ArgumentParser(description="Crop every car image and its paint mask to the same aspect ratio.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("--ratio", type=parse_ratio, default=DEFAULT_RATIO, help="target width/height, e.g. 120/140 (default)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="redo pairs the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only print the crop boxes, write nothing")
+    args = parser.parse_args()
+    sys.exit(1 if normalize(args.root, args.ratio, args.workers, args.force, args.dry_run) else 0)
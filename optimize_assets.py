@@ -0,0 +1,189 @@
+from PIL import Image, features
+from asset_manifest import AssetManifest
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import io
+import numpy as np
+import os
+import sys
+import time
+
+# Lossless PNG recompression (in place) plus WebP/AVIF variants written to a
+# mirrored tree, for the car images that AssetService downloads on first run.
+
+TOOL_NAME = "optimize_assets"
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_OUT = "build/optimized_assets"
+DEFAULT_QUALITY = 85
+SEARCH_QUALITIES = (50, 60, 70, 75, 80, 85, 90, 95)
+
+
+def encode(img, fmt, **options):
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def premultiplied(img):
+    # Colour under fully transparent pixels is invisible, so compare what is shown
+    rgba = np.asarray(img.convert("RGBA"), dtype=np.float32)
+    return rgba[..., :3] * (rgba[..., 3:] / 255), rgba[..., 3]
+
+
+def visual_diff(a, b):
+    # Mean absolute difference (0-255) of premultiplied colour and alpha
+    rgb_a, alpha_a = premultiplied(a)
+    rgb_b, alpha_b = premultiplied(b)
+    return float(max(np.abs(rgb_a - rgb_b).mean(), np.abs(alpha_a - alpha_b).mean()))
+
+
+def recompress_png(img, original_bytes):
+    # Candidates are only kept if they decode to exactly the same pixels
+    candidates = [img]
+    if img.mode == "RGBA" and img.getchannel("A").getextrema() == (255, 255):
+        candidates.append(img.convert("RGB"))
+
+    reference = np.asarray(img.convert("RGBA"))
+    best = original_bytes
+    for candidate in candidates:
+        data = encode(candidate, "PNG", optimize=True)
+        if len(data) >= len(best):
+            continue
+        with Image.open(io.BytesIO(data)) as decoded:
+            if np.array_equal(np.asarray(decoded.convert("RGBA")), reference):
+                best = data
+    return best
+
+
+def lossy_variant(img, fmt, quality, max_diff):
+    if max_diff is None:
+        data = encode(img, fmt, quality=quality)
+        return data, quality
+    # Lowest quality whose decoded result stays within the visual threshold
+    for q in SEARCH_QUALITIES:
+        data = encode(img, fmt, quality=q)
+        with Image.open(io.BytesIO(data)) as decoded:
+            if visual_diff(img, decoded) <= max_diff:
+                return data, q
+    return encode(img, fmt, lossless=True), "lossless"
+
+
+def variant_path(out_dir, root, path, ext):
+    rel = os.path.relpath(path, root)
+    return os.path.join(out_dir, os.path.splitext(rel)[0] + ext)
+
+
+def optimize_file(path, root, out_dir, quality=DEFAULT_QUALITY, max_diff=None, formats=("webp",), dry_run=False):
+    try:
+        with open(path, "rb") as f:
+            original = f.read()
+        with Image.open(io.BytesIO(original)) as img:
+            img.load()
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+
+            png = recompress_png(img, original)
+            result = {"path": path, "before": len(original), "png": len(png), "outputs": [path]}
+            if not dry_run and len(png) < len(original):
+                with open(path, "wb") as f:
+                    f.write(png)
+
+            for fmt in formats:
+                data, used = lossy_variant(img, fmt.upper(), quality, max_diff)
+                result[fmt] = len(data)
+                result[fmt + "_quality"] = used
+                out_path = variant_path(out_dir, root, path, "." + fmt)
+                if not dry_run:
+                    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                    with open(out_path, "wb") as f:
+                        f.write(data)
+                    result["outputs"].append(out_path)
+        return result
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def brand_of(path, root):
+    rel = os.path.relpath(path, root)
+    return rel.split(os.sep)[0] if os.sep in rel else "."
+
+
+def print_report(results, root, formats):
+    totals = {}
+    for r in results:
+        row = totals.setdefault(brand_of(r["path"], root), {"files": 0, "before": 0, "png": 0, **{f: 0 for f in formats}})
+        row["files"] += 1
+        for key in ("before", "png", *formats):
+            row[key] += r[key]
+
+    mb = lambda n: f"{n / 1e6:8.2f}"
+    header = f"{'brand':<12}{'files':>6}{'png MB':>9}{'optimized':>10}" + "".join(f"{f + ' MB':>9}" for f in formats)
+    print(header)
+    print("-" * len(header))
+    grand = {"files": 0, "before": 0, "png": 0, **{f: 0 for f in formats}}
+    for brand in sorted(totals):
+        row = totals[brand]
+        for key in grand:
+            grand[key] += row[key]
+        print(f"{brand:<12}{row['files']:>6}{mb(row['before']):>9} {mb(row['png']):>9}" + "".join(f" {mb(row[f])}" for f in formats))
+    print("-" * len(header))
+    print(f"{'total':<12}{grand['files']:>6}{mb(grand['before']):>9} {mb(grand['png']):>9}" + "".join(f" {mb(grand[f])}" for f in formats))
+    if grand["before"]:
+        for f in formats:
+            print(f"{f}: {100 * (1 - grand[f] / grand['before']):.1f}% smaller than the original PNGs")
+
+
+def optimize_tree(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, quality=DEFAULT_QUALITY, max_diff=None,
+                  formats=("webp",), workers=None, force=False, dry_run=False):
+    paths = sorted(
+        os.path.join(dirpath, f)
+        for dirpath, _, filenames in os.walk(root)
+        for f in filenames if f.lower().endswith(".png")
+    )
+    params = {"quality": quality, "max_diff": max_diff, "formats": list(formats), "out_dir": out_dir}
+
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    if not force and not dry_run:
+        pending = [p for p in paths if not manifest.is_up_to_date(TOOL_NAME, p, params)]
+        print(f"{len(paths) - len(pending)} of {len(paths)} images already up to date")
+        paths = pending
+
+    start = time.perf_counter()
+    results = []
+    job = partial(optimize_file, root=root, out_dir=out_dir, quality=quality,
+                  max_diff=max_diff, formats=formats, dry_run=dry_run)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(job, paths, chunksize=2):
+            if "error" in result:
+                print(f"Error processing {result['path']}: {result['error']}")
+                continue
+            if not dry_run:
+                manifest.record(TOOL_NAME, result["path"], params, outputs=result["outputs"])
+            results.append(result)
+    print(f"Processed {len(results)} images in {time.perf_counter() - start:.2f}s\n")
+    if results:
+        print_report(results, root, formats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompress PNGs losslessly and build WebP/AVIF variants.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT, help="where variants are written (mirrors root)")
+    parser.add_argument("-q", "--quality", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--max-diff", type=float, help="pick the lowest quality whose mean visual error stays under this (0-255)")
+    parser.add_argument("--avif", action="store_true", help="also write AVIF variants")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="reprocess files the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report sizes, write nothing")
+    args = parser.parse_args()
+
+    formats = ["webp"]
+    if args.avif:
+        if not features.check("avif"):
+            print("This Pillow build has no AVIF support")
+            sys.exit(1)
+        formats.append("avif")
+    optimize_tree(args.root, args.out_dir, args.quality, args.max_diff, tuple(formats),
+                  args.workers, args.force, args.dry_run)
@@ -0,0 +1,256 @@
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+from asset_manifest import AssetManifest
+
+# Shrinks the Lottie files in assets/animations, which are parsed on the UI
+# isolate every time one plays. Floats are rounded to --precision decimals,
+# hidden layers and shapes are dropped along with root layers that never
+# enter the composition's frame range and assets no layer refers to, and
+# embedded base64 images are written out as optimized PNGs next to the JSON
+# (lottie resolves "u" + "p" relative to the animation). The output is
+# minified into build/animations with the same layout, and each file is
+# reported with its bytes and json.loads time before and after.
+
+TOOL_NAME = "optimize_lottie"
+DEFAULT_ROOT = "assets/animations"
+DEFAULT_OUT = "build/animations"
+DEFAULT_PRECISION = 3
+IMAGES_DIR = "images/"
+PARSE_RUNS = 20
+
+
+def round_floats(value, precision):
+    if isinstance(value, float):
+        value = round(value, precision)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {k: round_floats(v, precision) for k, v in value.items()}
+    if isinstance(value, list):
+        return [round_floats(v, precision) for v in value]
+    return value
+
+
+def drop_hidden_shapes(value, stats):
+    # Shape items with "hd" are skipped by the renderer wherever they sit
+    if isinstance(value, dict):
+        for key in ("shapes", "it"):
+            items = value.get(key)
+            if isinstance(items, list):
+                kept = [s for s in items if not (isinstance(s, dict) and s.get("hd") is True)]
+                stats["shapes"] += len(items) - len(kept)
+                value[key] = kept
+        for v in value.values():
+            drop_hidden_shapes(v, stats)
+    elif isinstance(value, list):
+        for v in value:
+            drop_hidden_shapes(v, stats)
+
+
+def prune_layers(layers, frame_range, stats):
+    # Parents, track mattes ("td") and matted layers ("tt") stay even when
+    # hidden: removing them would re-parent or re-matte their neighbours
+    parents = {layer.get("parent") for layer in layers if "parent" in layer}
+    kept = []
+    for layer in layers:
+        hidden = layer.get("hd") is True
+        if frame_range and not hidden:
+            ip, op = layer.get("ip", frame_range[0]), layer.get("op", frame_range[1])
+            hidden = op <= frame_range[0] or ip >= frame_range[1]
+        if hidden and layer.get("ind") not in parents and not layer.get("td") and not layer.get("tt"):
+            stats["layers"] += 1
+            continue
+        kept.append(layer)
+    return kept
+
+
+def used_assets(animation):
+    # Asset ids reachable from the root layers through precomps
+    assets = {a.get("id"): a for a in animation.get("assets", [])}
+    seen = set()
+    stack = [animation.get("layers", [])]
+    while stack:
+        for layer in stack.pop():
+            ref = layer.get("refId")
+            if ref in assets and ref not in seen:
+                seen.add(ref)
+                stack.append(assets[ref].get("layers", []))
+    return seen
+
+
+def extract_image(asset, name, out_dir, dry_run):
+    # Decodes a "data:image/...;base64," asset into out_dir/images/<name>.png,
+    # no larger than the size the animation draws it at
+    payload = asset["p"].partition(",")[2]
+    data = base64.b64decode(payload)
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        if img.mode == "RGBA" and img.getchannel("A").getextrema() == (255, 255):
+            img = img.convert("RGB")
+        w, h = asset.get("w", img.width), asset.get("h", img.height)
+        if w < img.width and h < img.height:
+            img = img.resize((w, h), Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG", optimize=True)
+    file_name = f"{name}.png"
+    path = os.path.join(out_dir, IMAGES_DIR, file_name)
+    if not dry_run:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+    asset.update({"u": IMAGES_DIR, "p": file_name, "e": 0})
+    return path, len(data), buffer.tell()
+
+
+def optimize(animation, precision, stem, out_dir, dry_run=False):
+    stats = {"layers": 0, "shapes": 0, "assets": 0, "images": []}
+    frame_range = (animation.get("ip", 0), animation.get("op", 0)) if "op" in animation else None
+    animation["layers"] = prune_layers(animation.get("layers", []), frame_range, stats)
+    for asset in animation.get("assets", []):
+        if "layers" in asset:
+            # Precomp layers run on their own (possibly remapped) clock
+            asset["layers"] = prune_layers(asset["layers"], None, stats)
+    drop_hidden_shapes(animation, stats)
+
+    if "assets" in animation:
+        used = used_assets(animation)
+        kept = [a for a in animation["assets"] if a.get("id") in used]
+        stats["assets"] = len(animation["assets"]) - len(kept)
+        animation["assets"] = kept
+        for asset in kept:
+            if str(asset.get("p", "")).startswith("data:image/") and asset.get("e") == 1:
+                stats["images"].append(extract_image(asset, f"{stem}_{asset['id']}", out_dir, dry_run))
+    return round_floats(animation, precision), stats
+
+
+def encode(animation):
+    return json.dumps(animation, ensure_ascii=False, separators=(",", ":"))
+
+
+def parse_ms(text):
+    best = float("inf")
+    for _ in range(PARSE_RUNS):
+        start = time.perf_counter()
+        json.loads(text)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def check(original, optimized):
+    # The optimized file must still describe the same composition
+    if optimized.get("v") != original.get("v"):
+        return "'v' changed"
+    for key in ("w", "h", "ip", "op", "fr"):
+        if key in original and abs(optimized.get(key, 0) - original[key]) > 0.01:
+            return f"'{key}' changed"
+    ids = {a.get("id") for a in optimized.get("assets", [])}
+    missing = {layer["refId"] for layer in optimized.get("layers", []) if "refId" in layer} - ids
+    if missing:
+        return f"dangling refId {sorted(missing)}"
+    return None
+
+
+def optimize_file(path, root, out_dir, precision=DEFAULT_PRECISION, dry_run=False):
+    rel = os.path.relpath(path, root)
+    out_path = os.path.join(out_dir, rel)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        original = json.loads(text)
+        stem = os.path.splitext(os.path.basename(rel))[0].replace(" ", "_")
+        animation, stats = optimize(json.loads(text), precision, stem, os.path.dirname(out_path), dry_run)
+        output = encode(animation)
+        error = check(original, animation)
+        if error:
+            return {"path": path, "error": error}
+        if not dry_run:
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(output)
+        return {
+            "path": path,
+            "out_path": out_path,
+            "bytes": len(text.encode("utf-8")),
+            "out_bytes": len(output.encode("utf-8")),
+            "image_bytes": sum(size for _, _, size in stats["images"]),
+            "parse_ms": parse_ms(text),
+            "out_parse_ms": parse_ms(output),
+            "layers": stats["layers"],
+            "shapes": stats["shapes"],
+            "assets": stats["assets"],
+            "images": [image for image, _, _ in stats["images"]],
+        }
+    except Exception as e:
+        return {"path": path, "error": str(e)}
+
+
+def find_animations(root):
+    return sorted(
+        os.path.join(dirpath, f)
+        for dirpath, _, filenames in os.walk(root)
+        for f in filenames if f.lower().endswith(".json")
+    )
+
+
+def optimize_all(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, precision=DEFAULT_PRECISION, workers=None,
+                 force=False, dry_run=False):
+    paths = find_animations(root)
+    params = {"precision": precision, "out_dir": out_dir}
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    if not force and not dry_run:
+        pending = [p for p in paths if not manifest.is_up_to_date(TOOL_NAME, p, params)]
+        print(f"{len(paths) - len(pending)} of {len(paths)} animations already up to date")
+        paths = pending
+
+    start = time.perf_counter()
+    results = []
+    failed = False
+    job = partial(optimize_file, root=root, out_dir=out_dir, precision=precision, dry_run=dry_run)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(job, paths):
+            if "error" in result:
+                failed = True
+                print(f"❌ {result['path']}: {result['error']}")
+                continue
+            if not dry_run:
+                manifest.record(TOOL_NAME, result["path"], params, outputs=[result["out_path"], *result["images"]])
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    for r in results:
+        after = r["out_bytes"] + r["image_bytes"]
+        removed = ", ".join(f"{r[k]} {k}" for k in ("layers", "shapes", "assets") if r[k])
+        extracted = f", {len(r['images'])} images extracted" if r["images"] else ""
+        print(f"✅ {os.path.relpath(r['path'], root)}: {r['bytes'] / 1e3:.0f} KB -> {r['out_bytes'] / 1e3:.0f} KB JSON"
+              f" (-{(1 - after / r['bytes']) * 100:.0f}%), parse {r['parse_ms']:.1f}ms -> {r['out_parse_ms']:.1f}ms"
+              f"{'; dropped ' + removed if removed else ''}{extracted}")
+    if results:
+        before = sum(r["bytes"] for r in results)
+        after = sum(r["out_bytes"] + r["image_bytes"] for r in results)
+        parse_before = sum(r["parse_ms"] for r in results)
+        parse_after = sum(r["out_parse_ms"] for r in results)
+        print(f"\n{len(results)} animations in {elapsed:.2f}s: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB "
+              f"({(before - after) / 1e3:.0f} KB saved), parse {parse_before:.0f}ms -> {parse_after:.0f}ms")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Minify and prune the Lottie animations.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT, help="where optimized animations are written (mirrors root)")
+    parser.add_argument("-p", "--precision", type=int, default=DEFAULT_PRECISION, help="decimals kept on floats (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="reprocess animations the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report savings, write nothing")
+    args = parser.parse_args()
+    sys.exit(1 if optimize_all(args.root, args.out_dir, args.precision, args.workers, args.force, args.dry_run) else 0)
@@ -0,0 +1,298 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+from asset_manifest import AssetManifest, file_hash
+
+# The reverse of smart_split.py: packs each model folder's frames (slim_1.png
+# ... slim_6.png) into one atlas plus a JSON frame index, so a list scrolls
+# through one decoded texture per model instead of six files. Only the
+# <stem>_<N>.png crops count as frames; the sheet they were cut from and the
+# _fixed/_mask files stay out. Frames are trimmed to their non-transparent
+# box and placed with a skyline bottom-left packer; --check cuts every frame
+# back out and compares it with its source, and fails on any non-frame source.
+
+TOOL_NAME = "pack_atlas"
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_OUT = "build/atlases"
+INDEX_VERSION = 1
+PADDING = 2
+MAX_SIZE = 4096  # Largest texture every target GPU accepts
+WIDTH_STEP = 8
+FRAME_RE = re.compile(r"(?P<stem>.+)_\d+\.png", re.IGNORECASE)
+NOT_FRAMES = ("_fixed", "_mask")  # normalize_assets.py / register_mask.py outputs
+
+
+def trim_box(img):
+    # Box of the pixels with any alpha; fully transparent images keep their canvas
+    if img.mode == "RGBA":
+        box = img.getchannel("A").getbbox()
+        if box:
+            return box
+    return (0, 0, img.width, img.height)
+
+
+def skyline_pack(sizes, width, max_height):
+    # Bottom-left skyline: the skyline is a list of [x, y, w] segments covering
+    # the atlas width; each rect goes where its top edge ends up lowest.
+    # Returns ({index: (x, y)}, used_height) for the rects that fit.
+    skyline = [[0, 0, width]]
+    placed = {}
+    used_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0])):
+        w, h = sizes[i]
+        best = None
+        for start in range(len(skyline)):
+            x = skyline[start][0]
+            if x + w > width:
+                break
+            y = 0
+            end = start
+            covered = 0
+            while covered < w:
+                y = max(y, skyline[end][1])
+                covered += skyline[end][2]
+                end += 1
+            if y + h <= max_height and (best is None or (y + h, x) < (best[1] + h, best[0])):
+                best = (x, y, start)
+        if best is None:
+            continue
+
+        x, y, start = best
+        placed[i] = (x, y)
+        used_height = max(used_height, y + h)
+        # Replace the covered segments with the new top edge, keeping any remainder
+        end, right = start, x + w
+        while end < len(skyline) and skyline[end][0] < right:
+            end += 1
+        last = skyline[end - 1]
+        tail = [[right, last[1], last[0] + last[2] - right]] if last[0] + last[2] > right else []
+        skyline[start:end] = [[x, y + h, w]] + tail
+        # Merge neighbours at the same height
+        merged = [skyline[0]]
+        for segment in skyline[1:]:
+            if segment[1] == merged[-1][1]:
+                merged[-1][2] += segment[2]
+            else:
+                merged.append(segment)
+        skyline = merged
+    return placed, used_height
+
+
+def pack(sizes, padding=PADDING, max_size=MAX_SIZE):
+    # Tries every width (in WIDTH_STEP increments) from the widest rect up to
+    # a single row and keeps the smallest-area page; what doesn't fit goes on
+    # the next page. Returns [(width, height, {index: (x, y)}), ...].
+    padded = [(w + padding, h + padding) for w, h in sizes]
+    pages = []
+    remaining = list(range(len(sizes)))
+    while remaining:
+        page_sizes = [padded[i] for i in remaining]
+        widest = max(w for w, _ in page_sizes)
+        if widest > max_size + padding or max(h for _, h in page_sizes) > max_size + padding:
+            raise ValueError(f"a frame is larger than {max_size}px")
+        total = sum(w * h for w, h in page_sizes)
+        one_row = sum(w for w, _ in page_sizes)
+        best = None
+        for width in range(widest, max_size + padding + 1, WIDTH_STEP):
+            placed, height = skyline_pack(page_sizes, width, max_size + padding)
+            used_width = max(page_sizes[i][0] + x for i, (x, _) in placed.items())
+            score = (-len(placed), used_width * height)
+            if best is None or score < best[0]:
+                best = (score, used_width, height, placed)
+            if width >= one_row or (len(placed) == len(page_sizes) and used_width * height <= total * 1.05):
+                break
+        _, width, height, placed = best
+        pages.append((width - padding, height - padding, {remaining[i]: xy for i, xy in placed.items()}))
+        remaining = [remaining[i] for i in range(len(remaining)) if i not in placed]
+    return pages
+
+
+def is_frame(path):
+    # smart_split.py's numbered crops, not the sheet they came from
+    match = FRAME_RE.fullmatch(os.path.basename(path))
+    return bool(match) and not any(tag in match.group("stem").lower() for tag in NOT_FRAMES)
+
+
+def model_groups(root):
+    # Every folder with frames is one model; the frame name is the file stem
+    groups = {}
+    for dirpath, _, filenames in os.walk(root):
+        pngs = sorted(f for f in filenames if is_frame(f))
+        if pngs:
+            groups[os.path.relpath(dirpath, root)] = [os.path.join(dirpath, f) for f in pngs]
+    return dict(sorted(groups.items()))
+
+
+def atlas_paths(out_dir, rel_dir, page=None):
+    base = os.path.join(out_dir, rel_dir if rel_dir != "." else "_root")
+    if page:
+        base += f"-{page}"
+    return base + ".png", base + ".json"
+
+
+def build_atlas(rel_dir, sources, root, out_dir, padding=PADDING, max_size=MAX_SIZE):
+    try:
+        frames = []
+        for path in sources:
+            with Image.open(path) as img:
+                img = img.convert("RGBA")
+            box = trim_box(img)
+            frames.append((path, img.size, box, img.crop(box)))
+
+        start = time.perf_counter()
+        pages = pack([crop.size for _, _, _, crop in frames], padding, max_size)
+        pack_ms = (time.perf_counter() - start) * 1000
+
+        outputs = []
+        stats = {"frames": len(frames), "pages": len(pages), "pack_ms": pack_ms,
+                 "source_pixels": sum(w * h for _, (w, h), _, _ in frames), "atlas_pixels": 0}
+        for number, (width, height, placed) in enumerate(pages):
+            image_path, index_path = atlas_paths(out_dir, rel_dir, number if len(pages) > 1 else None)
+            atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+            index = {}
+            for i, (x, y) in placed.items():
+                path, (source_w, source_h), (left, top, right, bottom), crop = frames[i]
+                atlas.paste(crop, (x, y))
+                index[os.path.splitext(os.path.basename(path))[0]] = {
+                    "frame": {"x": x, "y": y, "w": crop.width, "h": crop.height},
+                    "spriteSourceSize": {"x": left, "y": top, "w": crop.width, "h": crop.height},
+                    "sourceSize": {"w": source_w, "h": source_h},
+                    "trimmed": (left, top, right, bottom) != (0, 0, source_w, source_h),
+                    "source": os.path.relpath(path, root).replace(os.sep, "/"),
+                    "hash": file_hash(path),
+                }
+
+            os.makedirs(os.path.dirname(image_path), exist_ok=True)
+            atlas.save(image_path)
+            with open(index_path, "w") as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "image": os.path.basename(image_path),
+                    "size": {"w": width, "h": height},
+                    "padding": padding,
+                    "frames": index,
+                }, f, indent=1, sort_keys=True)
+            outputs += [image_path, index_path]
+            stats["atlas_pixels"] += width * height
+        return rel_dir, sources, outputs, stats, None
+    except Exception as e:
+        return rel_dir, sources, [], None, str(e)
+
+
+def validate_atlas(index_path, root):
+    # Cut every frame back out of the atlas and compare it with its source:
+    # visible pixels must match exactly and anything trimmed must be fully
+    # transparent. Returns a list of problems.
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    with Image.open(os.path.join(os.path.dirname(index_path), index["image"])) as atlas:
+        atlas = atlas.convert("RGBA")
+
+    problems = []
+    for name, entry in sorted(index["frames"].items()):
+        if not is_frame(entry["source"]):
+            problems.append(f"{name}: {entry['source']} is not a <stem>_<N>.png frame (a source sheet?)")
+            continue
+        source_path = os.path.join(root, entry["source"])
+        if not os.path.exists(source_path):
+            problems.append(f"{name}: {entry['source']} no longer exists")
+            continue
+        with Image.open(source_path) as img:
+            original = np.asarray(img.convert("RGBA"))
+
+        fr, sp, size = entry["frame"], entry["spriteSourceSize"], entry["sourceSize"]
+        if original.shape[:2] != (size["h"], size["w"]):
+            problems.append(f"{name}: source is {original.shape[1]}x{original.shape[0]}, index says {size['w']}x{size['h']}")
+            continue
+        rebuilt = np.zeros_like(original)
+        crop = np.asarray(atlas.crop((fr["x"], fr["y"], fr["x"] + fr["w"], fr["y"] + fr["h"])))
+        rebuilt[sp["y"]:sp["y"] + sp["h"], sp["x"]:sp["x"] + sp["w"]] = crop
+
+        visible = original[..., 3] > 0
+        alpha_ok = np.array_equal(rebuilt[..., 3], original[..., 3])
+        colour_ok = np.array_equal(rebuilt[visible], original[visible])
+        if not (alpha_ok and colour_ok):
+            bad = np.count_nonzero((rebuilt != original).any(axis=2) & (visible | (rebuilt[..., 3] > 0)))
+            problems.append(f"{name}: {bad} pixels differ from {entry['source']}")
+    return problems
+
+
+def pack_all(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, padding=PADDING, max_size=MAX_SIZE, workers=None, force=False):
+    groups = model_groups(root)
+    params = {"padding": padding, "max_size": max_size, "out_dir": out_dir}
+
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME)
+    # Sheets packed before frames were filtered; their entries would delete the atlas once the sheet goes
+    entries = manifest.tools.get(TOOL_NAME, {})
+    for key in [k for k in entries if not is_frame(k)]:
+        del entries[key]
+        manifest.dirty = True
+    pending = groups
+    if not force:
+        pending = {
+            rel_dir: sources for rel_dir, sources in groups.items()
+            if not all(manifest.is_up_to_date(TOOL_NAME, p, {**params, "group": rel_dir}) for p in sources)
+        }
+        print(f"{len(groups) - len(pending)} of {len(groups)} models already up to date")
+
+    start = time.perf_counter()
+    totals = {"frames": 0, "pages": 0, "source_pixels": 0, "atlas_pixels": 0}
+    failures = 0
+    job = partial(build_atlas, root=root, out_dir=out_dir, padding=padding, max_size=max_size)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_dir, sources, outputs, stats, error in pool.map(job, pending, pending.values()):
+            if error:
+                failures += 1
+                print(f"Error packing {rel_dir}: {error}")
+                continue
+            # Recorded per source so removing or editing any frame rebuilds the atlas
+            for path in sources:
+                manifest.record(TOOL_NAME, path, {**params, "group": rel_dir}, outputs=outputs)
+            for key in totals:
+                totals[key] += stats[key]
+            print(f"{rel_dir}: {stats['frames']} frames -> {stats['pages']} page(s), "
+                  f"{stats['source_pixels'] / 1e6:.2f} MP -> {stats['atlas_pixels'] / 1e6:.2f} MP, "
+                  f"packed in {stats['pack_ms']:.1f}ms")
+
+    if totals["pages"]:
+        print(f"\nPacked {totals['frames']} images into {totals['pages']} atlases in {time.perf_counter() - start:.2f}s; "
+              f"decoded pixels {totals['source_pixels'] / 1e6:.1f} MP -> {totals['atlas_pixels'] / 1e6:.1f} MP")
+    return failures
+
+
+def check_all(out_dir=DEFAULT_OUT, root=DEFAULT_ROOT):
+    failures = 0
+    count = 0
+    for dirpath, _, filenames in os.walk(out_dir):
+        for name in sorted(f for f in filenames if f.endswith(".json")):
+            count += 1
+            problems = validate_atlas(os.path.join(dirpath, name), root)
+            failures += bool(problems)
+            for problem in problems:
+                print(f"❌ {os.path.join(dirpath, name)}: {problem}")
+    print(f"Checked {count} atlases, {failures} with mismatches")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack each model's car images into one atlas with a JSON frame index.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT)
+    parser.add_argument("--padding", type=int, default=PADDING, help="transparent pixels between frames (default: %(default)s)")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE, help="largest atlas side before starting a new page")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="repack models the manifest says are done")
+    parser.add_argument("--check", action="store_true", help="only validate existing atlases against their sources")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(1 if check_all(args.out_dir, args.root) else 0)
+    sys.exit(1 if pack_all(args.root, args.out_dir, args.padding, args.max_size, args.workers, args.force) else 0)
@@ -0,0 +1,187 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+from asset_manifest import AssetManifest
+
+# Renders every paint colour of a car offline, replacing the two nested
+# ColorFiltered layers vehicle_image.dart puts over the paint mask at
+# runtime. Works on the pairs normalize_assets.py writes (Slim_fixed.png +
+# Slim_mask_fixed.png). Inside the mask each pixel gets the paint's hue and
+# saturation while its HSV value is scaled by paint value / median value of
+# the original paint, so reflections and shadows survive instead of being
+# flattened by BlendMode.srcIn. With hue and saturation fixed, RGB is
+# linear in value, so each colour is a single multiply over the image.
+# The mask's red channel (as in the Dart colour matrix) blends the result
+# with the original at the edges.
+
+TOOL_NAME = "recolor_vehicles"
+DEFAULT_ROOT = "assets/car_images"
+DEFAULT_OUT = "build/recolored"
+INDEX_NAME = "recolor_index.json"
+INDEX_VERSION = 1
+MIN_VALUE = 0.12  # Darkest paint value used for scaling, so black keeps its shading
+# _getVehicleColor in vehicle_image.dart; Beyaz is the unpainted render
+PALETTE = {
+    "Siyah": ("siyah", "#000000"),
+    "Gri": ("gri", "#9E9E9E"),
+    "Kırmızı": ("kirmizi", "#D32F2F"),
+    "Mavi": ("mavi", "#1976D2"),
+    "Gümüş": ("gumus", "#B0BEC5"),
+    "Kahverengi": ("kahverengi", "#795548"),
+    "Yeşil": ("yesil", "#388E3C"),
+}
+
+
+def parse_hex(text):
+    text = text.lstrip("#")
+    return np.array([int(text[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.float32) / 255
+
+
+def find_pairs(root):
+    # (image, mask) for every *_mask_fixed.png with its *_fixed.png beside it
+    pairs = []
+    for mask_path in sorted(glob.glob(os.path.join(root, "**", "*_mask_fixed.png"), recursive=True)):
+        image_path = mask_path[:-len("_mask_fixed.png")] + "_fixed.png"
+        if os.path.exists(image_path):
+            pairs.append((image_path, mask_path))
+        else:
+            print(f"Skipping {mask_path}: no {os.path.basename(image_path)} next to it")
+    return pairs
+
+
+def recolor(rgba, mask, colours):
+    # rgba: (h, w, 4) uint8, mask: (h, w) float 0-1; yields (name, rgba uint8)
+    rgb = rgba[..., :3].astype(np.float32) / 255
+    value = rgb.max(axis=2)
+    painted = mask > 0.5
+    if not painted.any():
+        raise ValueError("mask is empty")
+    reference = max(float(np.median(value[painted])), 1 / 255)
+    weight = mask[..., None]
+    keep = rgb * (1 - weight)
+    for name, colour in colours.items():
+        target = max(float(colour.max()), MIN_VALUE)
+        unit = colour / colour.max() if colour.max() > 0 else np.ones(3, dtype=np.float32)
+        # Value scaled to the paint, clipped to white
+        shaded = np.minimum(value * (target / reference), 1)[..., None] * unit
+        out = np.empty_like(rgba)
+        out[..., :3] = np.rint((keep + shaded * weight) * 255)
+        out[..., 3] = rgba[..., 3]
+        yield name, out
+
+
+def variant_path(out_dir, root, image_path, slug):
+    rel = os.path.relpath(image_path, root)
+    return os.path.join(out_dir, os.path.splitext(rel)[0] + f"_{slug}.png")
+
+
+def recolor_pair(pair, root, out_dir, palette=PALETTE, dry_run=False):
+    image_path, mask_path = pair
+    try:
+        with Image.open(image_path) as car, Image.open(mask_path) as mask_img:
+            if car.size != mask_img.size:
+                raise ValueError(f"mask is {mask_img.size[0]}x{mask_img.size[1]} but the image is "
+                                 f"{car.size[0]}x{car.size[1]}; run normalize_assets.py first")
+            rgba = np.asarray(car.convert("RGBA"))
+            mask = np.asarray(mask_img.convert("RGB"))[..., 0].astype(np.float32) / 255
+
+        colours = {name: parse_hex(hex_value) for name, (_, hex_value) in palette.items()}
+        variants = {}
+        for name, pixels in recolor(rgba, mask, colours):
+            out_path = variant_path(out_dir, root, image_path, palette[name][0])
+            if not dry_run:
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                Image.fromarray(pixels, "RGBA").save(out_path)
+            variants[name] = out_path
+        return {"image": image_path, "mask": mask_path, "variants": variants,
+                "coverage": float((mask > 0.5).mean())}
+    except Exception as e:
+        return {"image": image_path, "mask": mask_path, "error": str(e)}
+
+
+def load_index(out_dir):
+    try:
+        with open(os.path.join(out_dir, INDEX_NAME), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index["images"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_index(out_dir, images, palette):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, INDEX_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "palette": {k: v[1] for k, v in palette.items()}, "images": images},
+                  f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def recolor_all(root=DEFAULT_ROOT, out_dir=DEFAULT_OUT, palette=PALETTE, workers=None, force=False, dry_run=False):
+    pairs = find_pairs(root)
+    if not pairs:
+        print("No normalized image/mask pairs found; run normalize_assets.py first.")
+        return 0
+
+    params = {"palette": {k: v[1] for k, v in palette.items()}, "min_value": MIN_VALUE, "out_dir": out_dir}
+    index = load_index(out_dir)
+    rel = lambda p: os.path.relpath(p, root).replace(os.sep, "/")
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    if not force and not dry_run:
+        pending = [
+            p for p in pairs
+            if rel(p[0]) not in index
+            or not all(manifest.is_up_to_date(TOOL_NAME, src, {**params, "pair": list(p)}) for src in p)
+        ]
+        print(f"{len(pairs) - len(pending)} of {len(pairs)} pairs already up to date")
+    else:
+        pending = pairs
+
+    start = time.perf_counter()
+    failures = 0
+    rendered = 0
+    job = partial(recolor_pair, root=root, out_dir=out_dir, palette=palette, dry_run=dry_run)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(job, pending):
+            if "error" in result:
+                failures += 1
+                print(f"Error recoloring {result['image']}: {result['error']}")
+                continue
+            variants = result["variants"]
+            rendered += len(variants)
+            index[rel(result["image"])] = {name: os.path.relpath(p, out_dir).replace(os.sep, "/") for name, p in variants.items()}
+            print(f"{result['image']}: {len(variants)} colours, paint covers {result['coverage'] * 100:.0f}% of the image")
+            if not dry_run:
+                pair_params = {**params, "pair": [result["image"], result["mask"]]}
+                manifest.record(TOOL_NAME, result["image"], pair_params, outputs=list(variants.values()))
+                manifest.record(TOOL_NAME, result["mask"], pair_params)
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {rendered} variants of {len(pending) - failures} cars in {elapsed:.2f}s"
+          + (f" ({elapsed / rendered * 1000:.0f}ms per variant)" if rendered else ""))
+
+    index = {k: v for k, v in index.items() if k in {rel(p[0]) for p in pairs}}
+    if not dry_run:
+        save_index(out_dir, index, palette)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every paint colour of the masked cars ahead of time.")
+    parser.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    parser.add_argument("-o", "--out-dir", default=DEFAULT_OUT, help="where variants and recolor_index.json go (mirrors root)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="rerender pairs the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only report, write nothing")
+    args = parser.parse_args()
+    sys.exit(1 if recolor_all(args.root, args.out_dir, PALETTE, args.workers, args.force, args.dry_run) else 0)
@@ -0,0 +1,242 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+from align_mask import get_bbox
+
+# Registers a paint mask onto its car image. The model is
+#   image_xy = scale * mask_xy + offset   (per axis)
+# Scale and a first offset come from the bounding boxes (as in align_mask.py).
+# Each axis is then solved on the silhouettes' projections (scale search plus
+# FFT cross-correlation), and a 2D FFT phase correlation refines the offset.
+
+SCALE_SEARCH = np.linspace(0.96, 1.04, 41)
+
+
+def to_bgr(img):
+    # get_bbox works on BGR arrays; transparent pixels are flattened onto black
+    rgba = img.convert("RGBA")
+    flat = Image.new("RGBA", rgba.size, (0, 0, 0, 255))
+    flat.alpha_composite(rgba)
+    return np.asarray(flat.convert("RGB"))[..., ::-1]
+
+
+def image_silhouette(image, bgr):
+    # Binarize at half coverage so anti-aliased edges don't bias the scale.
+    # Cut-out renders use alpha; opaque ones fall back to the get_bbox rule.
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        alpha = np.asarray(image.convert("RGBA"))[..., 3]
+        if alpha.min() < 255:
+            return (alpha > 127).astype(np.float32)
+    bg = bgr[0, 0].astype(np.int16)
+    return (np.abs(bgr.astype(np.int16) - bg).sum(axis=2) > 20).astype(np.float32)
+
+
+def mask_silhouette(bgr):
+    return ((bgr > 127).all(axis=2) * 255).astype(np.uint8)
+
+
+def warp(img, size, scale_x, scale_y, offset_x, offset_y, resample=Image.BILINEAR):
+    # PIL maps output pixels back to input pixels, so pass the inverse transform
+    return img.transform(
+        size, Image.AFFINE,
+        (1 / scale_x, 0, -offset_x / scale_x, 0, 1 / scale_y, -offset_y / scale_y),
+        resample=resample,
+    )
+
+
+def _subpixel(left, center, right):
+    # Vertex of the parabola through three neighbouring samples
+    denom = left - 2 * center + right
+    return 0.0 if denom == 0 else 0.5 * (left - right) / denom
+
+
+def phase_correlation(a, b):
+    # Returns (dy, dx, peak) such that a is approximately b shifted by (dy, dx)
+    height, width = a.shape
+    cross = np.fft.rfft2(a) * np.conj(np.fft.rfft2(b))
+    cross /= np.abs(cross) + 1e-9
+    corr = np.fft.irfft2(cross, s=a.shape)
+
+    py, px = np.unravel_index(np.argmax(corr), corr.shape)
+    dy = py + _subpixel(corr[py - 1, px], corr[py, px], corr[(py + 1) % height, px])
+    dx = px + _subpixel(corr[py, px - 1], corr[py, px], corr[py, (px + 1) % width])
+    if dy > height / 2:
+        dy -= height
+    if dx > width / 2:
+        dx -= width
+    return dy, dx, float(corr[py, px])
+
+
+def _axis_fit(target, source, scale, target_center, source_center):
+    # 1D version of the problem on the silhouettes' projections: try scales
+    # around the bbox estimate, cross-correlate each resampled profile with
+    # the target via FFT and keep the best (scale, shift), both sub-pixel
+    n = len(target)
+    positions = np.arange(n)
+    source_positions = np.arange(len(source))
+    target = np.asarray(target, dtype=np.float64)
+    target_fft = np.fft.rfft(target, 2 * n)
+
+    scores, fits = [], []
+    for factor in SCALE_SEARCH:
+        s = scale * factor
+        o = target_center - s * source_center
+        moved = np.interp((positions - o) / s, source_positions, source, left=0, right=0)
+        corr = np.fft.irfft(target_fft * np.conj(np.fft.rfft(moved, 2 * n)))
+        corr /= (np.linalg.norm(target) * np.linalg.norm(moved)) or 1
+        lag = int(np.argmax(corr))
+        shift = lag + _subpixel(corr[lag - 1], corr[lag], corr[(lag + 1) % len(corr)])
+        if shift > n:
+            shift -= 2 * n
+        scores.append(corr[lag])
+        fits.append((s, o + shift))
+
+    best = int(np.argmax(scores))
+    if 0 < best < len(scores) - 1:
+        t = _subpixel(scores[best - 1], scores[best], scores[best + 1])
+        neighbour = fits[best + 1] if t > 0 else fits[best - 1]
+        t = abs(t)
+        return tuple(a + (b - a) * t for a, b in zip(fits[best], neighbour))
+    return fits[best]
+
+
+def register(image, mask):
+    image_bgr = to_bgr(image)
+    mask_bgr = to_bgr(mask)
+    target = image_silhouette(image, image_bgr)
+    source = mask_silhouette(mask_bgr)
+
+    img_min_x, img_max_x, img_min_y, img_max_y = get_bbox(image_bgr, is_mask=False)
+    mask_min_x, mask_max_x, mask_min_y, mask_max_y = get_bbox(mask_bgr, is_mask=True)
+    if img_max_x <= img_min_x or mask_max_x <= mask_min_x:
+        raise ValueError("empty image or mask")
+
+    sx, ox = _axis_fit(
+        target.sum(axis=0), source.sum(axis=0, dtype=np.float64),
+        (img_max_x - img_min_x) / (mask_max_x - mask_min_x),
+        (img_min_x + img_max_x) / 2, (mask_min_x + mask_max_x) / 2,
+    )
+    sy, oy = _axis_fit(
+        target.sum(axis=1), source.sum(axis=1, dtype=np.float64),
+        (img_max_y - img_min_y) / (mask_max_y - mask_min_y),
+        (img_min_y + img_max_y) / 2, (mask_min_y + mask_max_y) / 2,
+    )
+
+    # Final 2D phase correlation catches what the projections can't see
+    moved = warp(Image.fromarray(source), image.size, sx, sy, ox, oy)
+    dy, dx, _ = phase_correlation(target, np.asarray(moved, dtype=np.float32) / 255)
+    return sx, sy, ox + dx, oy + dy
+
+
+def image_path_for(mask_path):
+    directory, name = os.path.split(mask_path)
+    return os.path.join(directory, name.replace("_mask", "", 1))
+
+
+def aligned_path_for(mask_path):
+    return os.path.splitext(mask_path)[0] + "_aligned.png"
+
+
+def register_pair(mask_path, image_path=None, output_path=None, write=True):
+    image_path = image_path or image_path_for(mask_path)
+    output_path = output_path or aligned_path_for(mask_path)
+    try:
+        with Image.open(image_path) as image, Image.open(mask_path) as mask:
+            image.load()
+            mask.load()
+            sx, sy, ox, oy = register(image, mask)
+            if write:
+                warp(mask, image.size, sx, sy, ox, oy).save(output_path)
+        return mask_path, (sx, sy, ox, oy), None
+    except Exception as e:
+        return mask_path, None, str(e)
+
+
+def find_masks(root):
+    masks = glob.glob(os.path.join(root, "**", "*_mask*.png"), recursive=True)
+    return sorted(p for p in masks if "_aligned" not in os.path.basename(p))
+
+
+def misalignment(transform, size):
+    # Largest displacement (px) the transform applies to any corner of the image
+    sx, sy, ox, oy = transform
+    width, height = size
+    return max(abs((sx - 1) * x + ox) for x in (0, width)), max(abs((sy - 1) * y + oy) for y in (0, height))
+
+
+def checked_path_for(mask_path, output_path=None):
+    # --check measures what the app would use: the aligned mask once written
+    aligned = output_path or aligned_path_for(mask_path)
+    return aligned if os.path.exists(aligned) else mask_path
+
+
+def register_all(root, workers=None, write=True, tolerance=None):
+    masks = find_masks(root)
+    pairs = [m for m in masks if os.path.exists(image_path_for(m))]
+    for m in sorted(set(masks) - set(pairs)):
+        print(f"Skipping {m}: no {os.path.basename(image_path_for(m))} next to it")
+    if not pairs:
+        print("No mask/image pairs found.")
+        return 0
+
+    start = time.perf_counter()
+    failures = 0
+    images = [image_path_for(m) for m in pairs]
+    targets = pairs if tolerance is None else [checked_path_for(m) for m in pairs]
+    job = partial(register_pair, write=write)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for image_path, (mask_path, transform, error) in zip(images, pool.map(job, targets, images)):
+            if error:
+                failures += 1
+                print(f"Error registering {mask_path}: {error}")
+                continue
+            sx, sy, ox, oy = transform
+            line = f"{mask_path}: SCALE {sx:.4f},{sy:.4f} OFFSET {ox:+.2f},{oy:+.2f}"
+            if tolerance is not None:
+                with Image.open(image_path) as image:
+                    err_x, err_y = misalignment(transform, image.size)
+                if max(err_x, err_y) > tolerance:
+                    failures += 1
+                    line += f"  MISALIGNED by up to {max(err_x, err_y):.2f}px"
+            print(line)
+    print(f"Registered {len(pairs)} masks in {time.perf_counter() - start:.2f}s")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Register paint masks onto their car images.")
+    parser.add_argument("paths", nargs="*", help="IMAGE MASK for a single pair, or a folder to search for *_mask*.png")
+    parser.add_argument("-o", "--output", help="aligned mask path for a single pair (default: <mask>_aligned.png)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--check", type=float, metavar="PX", help="only report; exit 1 if any mask (its _aligned output once written) is off by more than PX pixels")
+    args = parser.parse_args()
+
+    if len(args.paths) == 2 and os.path.isfile(args.paths[0]):
+        image_path, mask_path = args.paths
+        if args.check is not None:
+            mask_path = checked_path_for(mask_path, args.output)
+            print(f"Checking {mask_path}")
+        _, transform, error = register_pair(mask_path, image_path, args.output, write=args.check is None)
+        if error:
+            print(f"Error: {error}")
+            sys.exit(1)
+        sx, sy, ox, oy = transform
+        print(f"SCALE_X: {sx}")
+        print(f"SCALE_Y: {sy}")
+        print(f"OFFSET_X: {ox}")
+        print(f"OFFSET_Y: {oy}")
+        if args.check is not None:
+            with Image.open(image_path) as image:
+                if max(misalignment(transform, image.size)) > args.check:
+                    print(f"MISALIGNED by more than {args.check}px")
+                    sys.exit(1)
+    else:
+        root = args.paths[0] if args.paths else "assets/car_images"
+        failures = register_all(root, args.workers, write=args.check is None, tolerance=args.check)
+        sys.exit(1 if failures else 0)
@@ -1,6 +1,14 @@
 import os
+import sys
+from dart_patch import patch_files, replace
 
-file_path = '/Users/selimyay/cebinden/lib/screens/home_screen.dart'
+# Swaps in the scroll part of the home screen tutorial (steps 4-11). The
+# method is found by its signature and replaced up to its matching closing
+# brace, so unrelated edits to home_screen.dart don't shift it; if the
+# signature isn't there nothing is written.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+file_path = os.path.join(ROOT, 'lib', 'screens', 'home_screen.dart')
+ANCHOR = 'List<TargetFocus> _createTutorialTargetsPart2()'
 
 new_content = r'''  /// Tutorial Bölüm 2 (Scroll gerektiren alt kısım)
   List<TargetFocus> _createTutorialTargetsPart2() {
@@ -454,39 +462,20 @@ new_content = r'''  /// Tutorial Bölüm 2 (Scroll gerektiren alt kısım)
     ];
   }'''
 
-with open(file_path, 'r') as f:
-    lines = f.readlines()
-
-# Replace lines 3647 to 3939 (0-indexed: 3646 to 3939)
-# Note: Python slice is [start:end], so we need to be careful.
-# Line 3647 is index 3646.
-# Line 3939 is index 3938.
-# We want to replace everything from index 3646 up to and including index 3938.
-# So slice is [3646:3939] (since end is exclusive, wait, 3939 is the line number, index 3938. So slice [3646:3939] covers indices 3646...3938).
-
-start_line = 3647
-end_line = 3939
-
-# Adjust for 0-based index
-start_idx = start_line - 1
-end_idx = end_line
-
-# Verify the content we are replacing starts with the method signature
-if 'List<TargetFocus> _createTutorialTargetsPart2() {' not in lines[start_idx]:
-    print(f"Error: Start line {start_line} does not match expected content.")
-    print(f"Content: {lines[start_idx]}")
-    exit(1)
-
-# Verify the content we are replacing ends with '}'
-if '}' not in lines[end_idx - 1]:
-    print(f"Error: End line {end_line} does not match expected content.")
-    print(f"Content: {lines[end_idx - 1]}")
-    exit(1)
-
-# Perform replacement
-lines[start_idx:end_idx] = [new_content + '\n']
-
-with open(file_path, 'w') as f:
-    f.writelines(lines)
-
-print("Successfully replaced tutorial targets.")
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if any(a not in ('-n', '--dry-run') for a in args):
+        print("Usage: python3 replace_tutorial.py [-n|--dry-run]")
+        sys.exit(1)
+    dry_run = bool(args)
+    try:
+        changed = patch_files({file_path: [replace(ANCHOR, new_content)]}, dry_run=dry_run)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not changed[file_path]:
+        print("Tutorial targets are already up to date.")
+    elif dry_run:
+        print("Tutorial targets would be replaced (dry run).")
+    else:
+        print("Successfully replaced tutorial targets.")
@@ -0,0 +1,176 @@
+import argparse
+import random
+import sys
+import time
+import numpy as np
+from compile_vehicle_data import VEHICLE_DATA_DIR, compile_all
+
+# Offline market-spawn simulator. Brands and models are drawn with Walker's
+# alias method (O(1) per draw after an O(n) build), vectorized with numpy so
+# millions of listings take well under a second; price and year are drawn
+# uniformly from each model's compiled ranges. The realized shares are
+# compared against the configured weights so spawn rates can be tuned, and
+# --benchmark times the cumulative scan market_refresh_service.dart uses.
+
+DEFAULT_COUNT = 5_000_000
+BATCH = 1_000_000
+
+
+class AliasTable:
+    # Vose's construction: every column holds its own outcome with
+    # probability prob[i] and the alias[i] outcome otherwise
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(weights)
+        scaled = weights * n / weights.sum()
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        # Whatever is left is 1 up to rounding
+        self.n = n
+
+    def sample(self, rng, size):
+        column = rng.integers(0, self.n, size)
+        return np.where(rng.random(size) < self.prob[column], column, self.alias[column])
+
+
+class GroupedAliasTable:
+    # One alias table per brand stored back to back, so the model draw for a
+    # whole batch of brands is still a handful of array operations
+    def __init__(self, groups):
+        self.offsets = np.cumsum([0] + [len(g) for g in groups])[:-1]
+        self.sizes = np.array([len(g) for g in groups])
+        tables = [AliasTable(g) for g in groups]
+        self.prob = np.concatenate([t.prob for t in tables])
+        self.alias = np.concatenate([t.alias + o for t, o in zip(tables, self.offsets)])
+
+    def sample(self, rng, groups):
+        column = self.offsets[groups] + (rng.random(len(groups)) * self.sizes[groups]).astype(np.int64)
+        return np.where(rng.random(len(groups)) < self.prob[column], column, self.alias[column])
+
+
+def build_market(bundle):
+    brands = bundle['brands']
+    models = [(b['brand'], m) for b in brands for m in b['models']]
+    return {
+        'brands': [b['brand'] for b in brands],
+        'brand_weights': np.array([b['weight'] for b in brands]),
+        'models': models,
+        'model_brand': np.array([i for i, b in enumerate(brands) for _ in b['models']]),
+        'model_weights': np.array([b['weight'] * m['weight'] for b in brands for m in b['models']]),
+        'brand_sampler': AliasTable([b['weight'] for b in brands]),
+        'model_sampler': GroupedAliasTable([[m['weight'] for m in b['models']] for b in brands]),
+        'price_low': np.array([m['price'][0] for _, m in models], dtype=np.float64),
+        'price_high': np.array([m['price'][1] for _, m in models], dtype=np.float64),
+        'year_low': np.array([m['years'][0] for _, m in models]),
+        'year_high': np.array([m['years'][1] for _, m in models]),
+    }
+
+
+def draw(market, rng, size):
+    brand = market['brand_sampler'].sample(rng, size)
+    model = market['model_sampler'].sample(rng, brand)
+    low, high = market['price_low'][model], market['price_high'][model]
+    price = low + rng.random(size) * (high - low)
+    year = rng.integers(market['year_low'][model], market['year_high'][model] + 1)
+    return brand, model, price, year
+
+
+def cumulative_scan(weights, rand):
+    # What _selectRandomBrand / _selectRandomModel in market_refresh_service.dart do
+    cumulative = 0.0
+    for i, w in enumerate(weights):
+        cumulative += w
+        if rand < cumulative:
+            return i
+    return 0
+
+
+def simulate(count=DEFAULT_COUNT, seed=None, data_dir=VEHICLE_DATA_DIR, benchmark=False):
+    bundle, errors, _ = compile_all(data_dir)
+    if errors:
+        for e in errors:
+            print(f"❌ {e}")
+        return 1
+
+    start = time.perf_counter()
+    market = build_market(bundle)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(seed)
+    brand_counts = np.zeros(len(market['brands']), dtype=np.int64)
+    model_counts = np.zeros(len(market['models']), dtype=np.int64)
+    price_sum = np.zeros(len(market['models']))
+    prices = []
+    start = time.perf_counter()
+    for done in range(0, count, BATCH):
+        brand, model, price, year = draw(market, rng, min(BATCH, count - done))
+        brand_counts += np.bincount(brand, minlength=len(brand_counts))
+        model_counts += np.bincount(model, minlength=len(model_counts))
+        price_sum += np.bincount(model, weights=price, minlength=len(model_counts))
+        prices.append(price[:100_000])
+    elapsed = time.perf_counter() - start
+    print(f"Built samplers for {len(market['brands'])} brands / {len(market['models'])} models in {build_ms:.2f}ms")
+    print(f"Drew {count:,} listings in {elapsed:.2f}s ({count / elapsed / 1e6:.1f}M listings/s)\n")
+
+    print(f"{'brand':<12}{'config':>9}{'weight':>9}{'realized':>10}{'error':>9}")
+    brand_rates = {b['brand']: b['spawnRate'] for b in bundle['brands']}
+    for i, name in enumerate(market['brands']):
+        expected = market['brand_weights'][i]
+        realized = brand_counts[i] / count
+        print(f"{name:<12}{brand_rates[name]:>9.3f}{expected:>9.4f}{realized:>10.4f}{realized - expected:>+9.4f}")
+
+    print(f"\n{'model':<26}{'weight':>9}{'realized':>10}{'mean price':>14}{'range':>24}")
+    order = np.argsort(-model_counts)
+    for i in order:
+        brand, m = market['models'][i]
+        mean = price_sum[i] / model_counts[i] if model_counts[i] else 0
+        price_range = f"{m['price'][0]:,}-{m['price'][1]:,}"
+        print(f"{brand + ' ' + m['code']:<26}{market['model_weights'][i]:>9.4f}{model_counts[i] / count:>10.4f}"
+              f"{mean:>14,.0f}{price_range:>24}")
+
+    sample = np.concatenate(prices)
+    quantiles = np.percentile(sample, [5, 25, 50, 75, 95])
+    print("\nPrice percentiles (5/25/50/75/95): " + " / ".join(f"{q:,.0f}" for q in quantiles))
+
+    # Largest deviation in standard errors, so a broken sampler shows up
+    expected = market['model_weights']
+    z = np.abs(model_counts / count - expected) / np.sqrt(expected * (1 - expected) / count)
+    print(f"Largest model deviation: {z.max():.2f} standard errors")
+
+    if benchmark:
+        n = min(count, 200_000)
+        weights = list(market['brand_weights'])
+        start = time.perf_counter()
+        for _ in range(n):
+            cumulative_scan(weights, random.random())
+        scan = (time.perf_counter() - start) / n
+        start = time.perf_counter()
+        market['brand_sampler'].sample(rng, n)
+        alias = (time.perf_counter() - start) / n
+        print(f"\nBrand draw: cumulative scan {scan * 1e9:.0f}ns, alias table {alias * 1e9:.1f}ns "
+              f"({scan / alias:.0f}x)")
+        raw = [b['spawnRate'] for b in bundle['brands']]
+        if abs(sum(raw) - 1) > 1e-9:
+            # The Dart scan uses the raw rates: with a sum above 1 the last brands are starved
+            shares = np.bincount([cumulative_scan(raw, random.random()) for _ in range(n)], minlength=len(raw)) / n
+            worst = int(np.argmax(np.abs(shares - market['brand_weights'])))
+            print(f"Unnormalized rates sum to {sum(raw):.3f}; a cumulative scan over them gives "
+                  f"{market['brands'][worst]} {shares[worst]:.4f} instead of {market['brand_weights'][worst]:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate market listings from the vehicle_data spawn rates.")
+    parser.add_argument("-c", "--count", type=int, default=DEFAULT_COUNT, help="listings to draw (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="random seed for a reproducible run")
+    parser.add_argument("--benchmark", action="store_true", help="also time the cumulative scan the app uses")
+    args = parser.parse_args()
+    sys.exit(simulate(args.count, args.seed, benchmark=args.benchmark))
@@ -1,5 +1,15 @@
+import argparse
+import glob
+import json
 import os
+import re
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from PIL import Image
+from asset_manifest import file_hash
 
 def get_row_density(img, y, width):
     count = 0
@@ -17,6 +27,26 @@ def get_col_density(img, x, height):
             count += 1
     return count
 
+def content_mask(img):
+    # Same "content" test as get_row_density / get_col_density, for every pixel at once
+    pixels = np.asarray(img.convert('RGBA'))
+    return (pixels[..., 3] > 10) & (pixels[..., :3].min(axis=2) < 250)
+
+def summed_area_table(mask):
+    # sat[y, x] = number of content pixels in mask[:y, :x]
+    sat = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int64)
+    np.cumsum(np.cumsum(mask, axis=0), axis=1, out=sat[1:, 1:])
+    return sat
+
+def row_densities(sat, x1, y1, x2, y2):
+    # Content count of each row y1..y2-1 restricted to columns x1..x2-1
+    span = sat[y1:y2 + 1, x2] - sat[y1:y2 + 1, x1]
+    return np.diff(span).tolist()
+
+def col_densities(sat, x1, y1, x2, y2):
+    span = sat[y2, x1:x2 + 1] - sat[y1, x1:x2 + 1]
+    return np.diff(span).tolist()
+
 def find_low_density_gaps(densities, threshold_ratio=0.02, min_gap_size=5):
     # threshold_ratio: max density to consider as "gap" (relative to max density observed or width)
     # But simpler: relative to the dimension size.
@@ -50,72 +80,264 @@ def find_low_density_gaps(densities, threshold_ratio=0.02, min_gap_size=5):
         
     return content_segments
 
-def recursive_split(img, x_offset, y_offset, depth=0):
-    width, height = img.size
+def recursive_split(sat, x1, y1, x2, y2, depth=0):
+    width, height = x2 - x1, y2 - y1
     
     # Don't split too small
     if width < 50 or height < 50:
-        return [(x_offset, y_offset, x_offset+width, y_offset+height)]
+        return [(x1, y1, x2, y2)]
 
     # 1. Try Horizontal Split (Rows)
+    rows = find_low_density_gaps(row_densities(sat, x1, y1, x2, y2))
+    
+    # If we found multiple rows, recurse on each row
+    if len(rows) > 1:
+        results = []
+        for top, bottom in rows:
+            results.extend(recursive_split(sat, x1, y1 + top, x2, y1 + bottom, depth + 1))
+        return results
+
+    # 2. If no horizontal split, Try Vertical Split (Cols)
+    cols = find_low_density_gaps(col_densities(sat, x1, y1, x2, y2))
+    
+    # If we found multiple cols, recurse on each col
+    if len(cols) > 1:
+        results = []
+        for left, right in cols:
+            results.extend(recursive_split(sat, x1 + left, y1, x1 + right, y2, depth + 1))
+        return results
+
+    # 3. If no split found, this is a leaf
+    return [(x1, y1, x2, y2)]
+
+def detect_crops(img):
+    # The content mask and its prefix sums are built once; every recursion
+    # level then reads its row/column densities in O(length)
+    sat = summed_area_table(content_mask(img))
+    width, height = img.size
+    return recursive_split(sat, 0, 0, width, height)
+
+def recursive_split_legacy(img, x_offset, y_offset, depth=0):
+    # Original per-pixel version, kept to check detect_crops against
+    width, height = img.size
+    
+    if width < 50 or height < 50:
+        return [(x_offset, y_offset, x_offset+width, y_offset+height)]
+
     row_densities = [get_row_density(img, y, width) for y in range(height)]
     rows = find_low_density_gaps(row_densities)
     
-    # If we found multiple rows, recurse on each row
     if len(rows) > 1:
         results = []
         for y1, y2 in rows:
             sub_img = img.crop((0, y1, width, y2))
-            results.extend(recursive_split(sub_img, x_offset, y_offset + y1, depth + 1))
+            results.extend(recursive_split_legacy(sub_img, x_offset, y_offset + y1, depth + 1))
         return results
 
-    # 2. If no horizontal split, Try Vertical Split (Cols)
     col_densities = [get_col_density(img, x, height) for x in range(width)]
     cols = find_low_density_gaps(col_densities)
     
-    # If we found multiple cols, recurse on each col
     if len(cols) > 1:
         results = []
         for x1, x2 in cols:
             sub_img = img.crop((x1, 0, x2, height))
-            results.extend(recursive_split(sub_img, x_offset + x1, y_offset, depth + 1))
+            results.extend(recursive_split_legacy(sub_img, x_offset + x1, y_offset, depth + 1))
         return results
 
-    # 3. If no split found, this is a leaf
     return [(x_offset, y_offset, x_offset+width, y_offset+height)]
 
-def split_smart(image_path, output_dir):
-    print(f"Processing {image_path}...")
-    img = Image.open(image_path)
-    if img.mode != 'RGBA':
-        img = img.convert('RGBA')
-    
-    final_crops = recursive_split(img, 0, 0)
-    
-    print(f"Total detected regions: {len(final_crops)}")
-    
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    image_count = 0
-    for i, (x1, y1, x2, y2) in enumerate(final_crops):
-        width = x2 - x1
-        height = y2 - y1
-        
-        # Filter out tiny noise
-        if width < 50 or height < 50:
+MIN_CROP_SIZE = 50
+
+def index_path(image_path):
+    return os.path.splitext(image_path)[0] + '.crops.json'
+
+def load_index(image_path, sheet_hash):
+    # Stored crop boxes are reused only while the sheet itself is unchanged
+    path = index_path(image_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable index {path}: {e}")
+        return None
+    if index.get('hash') != sheet_hash:
+        return None
+    return [tuple(box) for box in index['crops']]
+
+def save_index(image_path, img, sheet_hash, crops, outputs):
+    # outputs: the crop files written, relative to the sheet's folder
+    index = {
+        'sheet': os.path.basename(image_path),
+        'size': list(img.size),
+        'hash': sheet_hash,
+        'crops': [list(box) for box in crops],
+        'outputs': outputs,
+    }
+    with open(index_path(image_path), 'w') as f:
+        json.dump(index, f, indent=2)
+
+def crop_target(image_path, output_dir=None, prefix=None):
+    # Crops go next to the sheet and are named after its folder (lotus/lotos.png -> lotus_N.png)
+    output_dir = output_dir or os.path.dirname(os.path.abspath(image_path))
+    prefix = prefix or os.path.basename(os.path.normpath(output_dir)).lower()
+    return output_dir, prefix
+
+def is_crop(image_path, prefix):
+    # True for names a split with this prefix writes (<prefix>_<N>.png)
+    return re.fullmatch(re.escape(prefix) + r'_\d+\.png', os.path.basename(image_path), re.IGNORECASE) is not None
+
+def recorded_crops(paths):
+    # {crop path: sheet path} for the crops that the .crops.json indexes in
+    # these files' folders say an earlier split wrote
+    recorded = {}
+    for directory in sorted({os.path.dirname(os.path.abspath(p)) for p in paths}):
+        for path in glob.glob(os.path.join(glob.escape(directory), '*.crops.json')):
+            try:
+                with open(path, 'r') as f:
+                    index = json.load(f)
+                sheet_path = os.path.join(directory, index['sheet'])
+                outputs = index.get('outputs')
+                if outputs is None:
+                    # Written before outputs were recorded: the default target
+                    _, prefix = crop_target(sheet_path)
+                    outputs = [f"{prefix}_{n}.png" for n in range(1, len(index['crops']) + 1)]
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            for out in outputs:
+                recorded[os.path.normcase(os.path.normpath(os.path.join(directory, out)))] = sheet_path
+    return recorded
+
+def split_smart(image_path, output_dir=None, prefix=None, redetect=False):
+    # Returns (image_path, crop count, error or None)
+    try:
+        print(f"Processing {image_path}...")
+        img = Image.open(image_path)
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+
+        output_dir, prefix = crop_target(image_path, output_dir, prefix)
+
+        sheet_hash = file_hash(image_path)
+        final_crops = None if redetect else load_index(image_path, sheet_hash)
+        if final_crops is not None:
+            print(f"Using {len(final_crops)} stored crop boxes from {index_path(image_path)}")
+        else:
+            # Filter out tiny noise
+            final_crops = [
+                (x1, y1, x2, y2) for x1, y1, x2, y2 in detect_crops(img)
+                if x2 - x1 >= MIN_CROP_SIZE and y2 - y1 >= MIN_CROP_SIZE
+            ]
+            print(f"Total detected regions: {len(final_crops)}")
+
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+
+        image_count = 0
+        outputs = []
+        for x1, y1, x2, y2 in final_crops:
+            crop = img.crop((x1, y1, x2, y2))
+            image_count += 1
+            output_filename = f"{prefix}_{image_count}.png"
+            output_path = os.path.join(output_dir, output_filename)
+            crop.save(output_path)
+            outputs.append(os.path.relpath(output_path, os.path.dirname(os.path.abspath(image_path))).replace(os.sep, '/'))
+            print(f"Saved {output_path} ({x2 - x1}x{y2 - y1})")
+        # Saved after the crops so the index lists what is on disk; a later
+        # batch skips exactly these files
+        save_index(image_path, img, sheet_hash, final_crops, outputs)
+
+        print(f"Final total images: {image_count}")
+        return image_path, image_count, None
+    except Exception as e:
+        return image_path, 0, str(e)
+
+def plan_batch(patterns, output_dir=None, prefix=None):
+    # Returns (sheets, {skipped crop: sheet that wrote it}, {(output_dir,
+    # prefix): [sheets]} for targets claimed by more than one sheet, or by a
+    # sheet whose own name is one of the crop names it would write)
+    matched = sorted({path for pattern in patterns for path in glob.glob(pattern, recursive=True)})
+    recorded = recorded_crops(matched)
+    sheets, skipped, targets, overwrites = [], {}, {}, set()
+    for path in matched:
+        sheet_path = recorded.get(os.path.normcase(os.path.abspath(path)))
+        if sheet_path is not None:
+            skipped[path] = sheet_path
             continue
-            
-        crop = img.crop((x1, y1, x2, y2))
-        image_count += 1
-        output_filename = f"signa_{image_count}.png"
-        output_path = os.path.join(output_dir, output_filename)
-        crop.save(output_path)
-        print(f"Saved {output_path} ({width}x{height})")
-            
-    print(f"Final total images: {image_count}")
+        target_dir, target_prefix = crop_target(path, output_dir, prefix)
+        target = (os.path.abspath(target_dir), target_prefix)
+        sheets.append(path)
+        targets.setdefault(target, []).append(path)
+        if is_crop(path, target_prefix) and os.path.dirname(os.path.abspath(path)) == target[0]:
+            overwrites.add(target)
+    conflicts = {target: paths for target, paths in targets.items() if len(paths) > 1 or target in overwrites}
+    return sheets, skipped, conflicts
+
+def split_batch(patterns, output_dir=None, prefix=None, redetect=False, workers=None):
+    sheets, skipped, conflicts = plan_batch(patterns, output_dir, prefix)
+    by_sheet = {}
+    for path, sheet_path in skipped.items():
+        by_sheet.setdefault(sheet_path, []).append(os.path.basename(path))
+    for sheet_path, names in sorted(by_sheet.items()):
+        print(f"Skipping {len(names)} crops {sheet_path} wrote: {', '.join(names)}")
+    if not sheets:
+        print("No sheets matched.")
+        return 0
+    if conflicts:
+        # Both sheets would write <prefix>_1.png... and overwrite each other,
+        # or a sheet named like its own crops would overwrite itself
+        for (target_dir, target_prefix), paths in sorted(conflicts.items()):
+            victim = "each other" if len(paths) > 1 else "itself"
+            print(f"Error: {', '.join(paths)} would overwrite {victim} writing "
+                  f"{os.path.join(target_dir, target_prefix)}_N.png; split with -p")
+        return len(conflicts)
+
+    start = time.perf_counter()
+    job = partial(split_smart, output_dir=output_dir, prefix=prefix, redetect=redetect)
+    total = 0
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, count, error in pool.map(job, sheets):
+            if error:
+                failures += 1
+                print(f"Error splitting {path}: {error}")
+                continue
+            total += count
+    print(f"Split {len(sheets) - failures} sheets into {total} images in {time.perf_counter() - start:.2f}s")
+    return failures
+
+def benchmark(image_path):
+    img = Image.open(image_path).convert('RGBA')
+    print(f"Benchmarking {image_path} ({img.width}x{img.height})")
+
+    start = time.perf_counter()
+    crops = detect_crops(img)
+    fast = time.perf_counter() - start
+    print(f"summed-area table: {fast * 1000:8.1f} ms, {len(crops)} regions")
+
+    start = time.perf_counter()
+    legacy_crops = recursive_split_legacy(img, 0, 0)
+    slow = time.perf_counter() - start
+    print(f"per-pixel:         {slow * 1000:8.1f} ms, {len(legacy_crops)} regions")
+    print(f"Speedup: {slow / fast:.0f}x, identical crop boxes: {crops == legacy_crops}")
 
 if __name__ == "__main__":
-    input_path = "/Users/selimyay/cebinden/assets/car_images/koyoro/lotus/lotos.png"
-    output_dir = "/Users/selimyay/cebinden/assets/car_images/koyoro/lotus/"
-    split_smart(input_path, output_dir)
+    parser = argparse.ArgumentParser(description="Split sprite sheets into one image per detected region.")
+    parser.add_argument("sheets", nargs="*", help="sheet paths or glob patterns (** is recursive)")
+    parser.add_argument("-o", "--output-dir", help="where to write crops (default: next to each sheet)")
+    parser.add_argument("-p", "--prefix", help="crop file name prefix (default: output folder name)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--redetect", action="store_true", help="ignore stored .crops.json boxes")
+    parser.add_argument("--benchmark", action="store_true", help="compare detection against the per-pixel version")
+    args = parser.parse_args()
+
+    if not args.sheets:
+        print('Usage: python3 smart_split.py "assets/car_images/**/sheet.png" [...] [-o DIR] [-p PREFIX] [-j N] [--redetect]')
+        sys.exit(1)
+
+    if args.benchmark:
+        for sheet in args.sheets:
+            benchmark(sheet)
+    else:
+        sys.exit(1 if split_batch(args.sheets, args.output_dir, args.prefix, args.redetect, args.workers) else 0)
@@ -0,0 +1,213 @@
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+from asset_manifest import AssetManifest
+from force_split import split_boxes as force_split_boxes
+from smart_split import content_mask
+
+# Python port of the old split_bavora*.swift scripts: cuts a sheet laid out
+# as a grid into one image per cell. The Swift scripts cut at exact multiples
+# of the tile size; here every cut is moved to the least dense line
+# (per-row/per-column content counts from smart_split.content_mask) within
+# a window around that position, so renders that sit off-center are not
+# sliced. On an empty gap the even cut is kept, so the existing bavora
+# tiles come out pixel-identical.
+
+TOOL_NAME = "split_grid"
+DEFAULT_GRID = (2, 3)  # cols x rows, as in the Swift scripts
+WINDOW = 0.25  # Fraction of a tile the cut may move either way
+CAR_IMAGES = "assets/car_images"
+# What the four Swift scripts did: sheet -> (output dir, file prefix)
+SHEETS = {
+    f"{CAR_IMAGES}/bavora/bavora.png": (f"{CAR_IMAGES}/bavora", "bavora"),
+    f"{CAR_IMAGES}/bavora/a_series/a_series.png": (f"{CAR_IMAGES}/bavora/a_series", "a_series"),
+    f"{CAR_IMAGES}/bavora/bavora_e.png": (f"{CAR_IMAGES}/bavora/e_series", "e_series"),
+    f"{CAR_IMAGES}/bavora/d_series/d_series.png": (f"{CAR_IMAGES}/bavora/d_series", "d_series"),
+}
+OUTPUT_RE = re.compile(r"_(\d+|top|bottom|fixed|mask.*)\.png$", re.IGNORECASE)
+
+
+def find_seams(profile, parts, window=WINDOW):
+    # Cut positions (exclusive ends of each piece but the last) for `parts`
+    # pieces along one axis. Each cut is the least dense line within
+    # +-window tiles of the even split; ties go to the line closest to it.
+    length = len(profile)
+    tile = length // parts
+    radius = max(1, int(tile * window))
+    seams = []
+    for k in range(1, parts):
+        nominal = k * tile
+        low = max(nominal - radius, seams[-1] + 1 if seams else 1)
+        high = min(nominal + radius, length - 1)
+        candidates = profile[low:high + 1]
+        lines = np.flatnonzero(candidates == candidates.min()) + low
+        seams.append(int(lines[np.argmin(np.abs(lines - nominal))]))
+    return seams
+
+
+def grid_boxes(xs, ys, width, height):
+    # Row-major boxes, numbered like the Swift output (index = row * cols + col + 1)
+    xs = [0, *xs, width]
+    ys = [0, *ys, height]
+    return [
+        (xs[c], ys[r], xs[c + 1], ys[r + 1])
+        for r in range(len(ys) - 1)
+        for c in range(len(xs) - 1)
+    ]
+
+
+def detect_grid(mask, cols, rows, window=WINDOW):
+    height, width = mask.shape
+    xs = find_seams(mask.sum(axis=0), cols, window)
+    ys = find_seams(mask.sum(axis=1), rows, window)
+    return grid_boxes(xs, ys, width, height), xs, ys
+
+
+def uniform_grid(width, height, cols, rows):
+    # The Swift scripts' tiles: fixed size, remainder pixels dropped
+    tile_w, tile_h = width // cols, height // rows
+    return [
+        (c * tile_w, r * tile_h, (c + 1) * tile_w, (r + 1) * tile_h)
+        for r in range(rows)
+        for c in range(cols)
+    ]
+
+
+def seam_cost(mask, xs, ys):
+    # Content pixels lying on the cut lines, i.e. how much of a car a cut goes through
+    return int(mask[:, xs].sum() + mask[ys, :].sum())
+
+
+def baseline(mask, cols, rows):
+    # (name, boxes, content pixels cut through, content pixels dropped) of the
+    # tool this replaces: force_split for a plain top/bottom split, the Swift grid otherwise
+    height, width = mask.shape
+    total = int(mask.sum())
+    if (cols, rows) == (1, 2):
+        top, bottom = force_split_boxes(width, height)
+        boxes = [top, bottom]
+        name = "force_split"
+        cut = int(mask[top[3] - 1].sum() + mask[bottom[1]].sum())
+    else:
+        boxes = uniform_grid(width, height, cols, rows)
+        name = "uniform grid"
+        cut = seam_cost(mask, [b[0] for b in boxes if b[0]], [b[1] for b in boxes if b[1]])
+    kept = sum(int(mask[y1:y2, x1:x2].sum()) for x1, y1, x2, y2 in boxes)
+    return name, boxes, cut, total - kept
+
+
+def outputs_for(sheet, output_dir=None, prefix=None):
+    if sheet in SHEETS and output_dir is None and prefix is None:
+        return SHEETS[sheet]
+    return (output_dir or os.path.dirname(sheet),
+            prefix or os.path.splitext(os.path.basename(sheet))[0].lower())
+
+
+def split_sheet(sheet, output_dir=None, prefix=None, cols=DEFAULT_GRID[0], rows=DEFAULT_GRID[1],
+                window=WINDOW, dry_run=False, compare=False):
+    try:
+        output_dir, prefix = outputs_for(sheet, output_dir, prefix)
+        with Image.open(sheet) as img:
+            img.load()
+            mask = content_mask(img)
+            boxes, xs, ys = detect_grid(mask, cols, rows, window)
+            outputs = []
+            for index, box in enumerate(boxes, 1):
+                out_path = os.path.join(output_dir, f"{prefix}_{index}.png")
+                if not dry_run:
+                    os.makedirs(output_dir, exist_ok=True)
+                    img.crop(box).save(out_path)
+                outputs.append(out_path)
+
+        result = {"sheet": sheet, "boxes": boxes, "outputs": outputs, "cut": seam_cost(mask, xs, ys)}
+        if compare:
+            name, reference, cut, dropped = baseline(mask, cols, rows)
+            result["baseline"] = {"name": name, "same": reference == boxes, "cut": cut, "dropped": dropped}
+        return result
+    except Exception as e:
+        return {"sheet": sheet, "error": str(e)}
+
+
+def find_sheets(paths):
+    # Files and glob patterns as given; folders contribute every PNG that
+    # isn't itself a tile or another tool's output
+    sheets = set()
+    for path in paths:
+        if os.path.isdir(path):
+            sheets.update(
+                p for p in glob.glob(os.path.join(path, "*.png"))
+                if not OUTPUT_RE.search(os.path.basename(p))
+            )
+        else:
+            sheets.update(glob.glob(path, recursive=True))
+    return sorted(sheets)
+
+
+def split_all(sheets, output_dir=None, prefix=None, cols=DEFAULT_GRID[0], rows=DEFAULT_GRID[1],
+              window=WINDOW, workers=None, force=False, dry_run=False, compare=False):
+    params = {"cols": cols, "rows": rows, "window": window}
+    manifest = AssetManifest()
+    manifest.remove_stale(TOOL_NAME, dry_run=dry_run)
+    if not force and not dry_run and not compare:
+        pending = [s for s in sheets if not manifest.is_up_to_date(TOOL_NAME, s, {**params, "to": outputs_for(s, output_dir, prefix)})]
+        print(f"{len(sheets) - len(pending)} of {len(sheets)} sheets already up to date")
+        sheets = pending
+
+    start = time.perf_counter()
+    failures = 0
+    job = partial(split_sheet, output_dir=output_dir, prefix=prefix, cols=cols, rows=rows,
+                  window=window, dry_run=dry_run, compare=compare)
+    with manifest, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(job, sheets):
+            if "error" in result:
+                failures += 1
+                print(f"Error splitting {result['sheet']}: {result['error']}")
+                continue
+            if not dry_run:
+                manifest.record(TOOL_NAME, result["sheet"], {**params, "to": outputs_for(result["sheet"], output_dir, prefix)},
+                                outputs=result["outputs"])
+            print(f"{result['sheet']}: {len(result['boxes'])} tiles, "
+                  f"{result['cut']} content pixels on the cuts")
+            for path, (x1, y1, x2, y2) in zip(result["outputs"], result["boxes"]):
+                print(f"  {path}  {x2 - x1}x{y2 - y1} at {x1},{y1}")
+            if compare:
+                b = result["baseline"]
+                print(f"  vs {b['name']}: {'identical boxes' if b['same'] else 'different boxes'}, "
+                      f"{b['cut']} content pixels on its cuts, {b['dropped']} dropped")
+    print(f"Split {len(sheets) - failures} sheets in {time.perf_counter() - start:.2f}s")
+    return failures
+
+
+def parse_grid(text):
+    cols, rows = (int(v) for v in text.lower().split("x"))
+    return cols, rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split grid sprite sheets into tiles, cutting along the emptiest lines.")
+    parser.add_argument("sheets", nargs="*", help="sheets, glob patterns or folders (default: the four bavora sheets)")
+    parser.add_argument("-g", "--grid", type=parse_grid, default=DEFAULT_GRID, help="COLSxROWS (default: 2x3)")
+    parser.add_argument("-o", "--output-dir", help="where to write tiles (default: next to each sheet)")
+    parser.add_argument("-p", "--prefix", help="tile file name prefix (default: sheet name)")
+    parser.add_argument("--window", type=float, default=WINDOW, help="how far (in tiles) a cut may move (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="resplit sheets the manifest says are done")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="only print the tile boxes, write nothing")
+    parser.add_argument("--baseline", action="store_true",
+                        help="compare with the tool this replaces (force_split for 1x2, the Swift grid otherwise); implies -n")
+    args = parser.parse_args()
+
+    sheets = find_sheets(args.sheets) if args.sheets else [s for s in SHEETS if os.path.exists(s)]
+    if not sheets:
+        print("No sheets found.")
+        sys.exit(1)
+    cols, rows = args.grid
+    sys.exit(1 if split_all(sheets, args.output_dir, args.prefix, cols, rows, args.window, args.workers,
+                            args.force, args.dry_run or args.baseline, args.baseline) else 0)
@@ -0,0 +1,62 @@
+import os
+import pytest
+from asset_manifest import AssetManifest
+
+
+@pytest.fixture
+def assets(tmp_path):
+    (tmp_path / "car.png").write_bytes(b"original pixels")
+    return tmp_path, AssetManifest(str(tmp_path / ".asset_manifest.json"))
+
+
+def rewrite_in_place(manifest, tool, source, data):
+    # What remove_background does: check, rewrite the source, record it as its only output
+    manifest.is_up_to_date(tool, source)
+    with open(source, "wb") as f:
+        f.write(data)
+    manifest.record(tool, source, outputs=[source])
+
+
+def test_in_place_rewrite_makes_derived_outputs_stale(assets):
+    root, manifest = assets
+    source, thumb = str(root / "car.png"), str(root / "car_thumb.png")
+    with open(thumb, "wb") as f:
+        f.write(b"thumbnail")
+    manifest.record("generate_thumbnails", source, outputs=[thumb])
+    assert manifest.is_up_to_date("generate_thumbnails", source)
+
+    rewrite_in_place(manifest, "remove_background", source, b"background removed")
+    assert not manifest.is_up_to_date("generate_thumbnails", source)
+    manifest.save()
+    assert not AssetManifest(manifest.path).is_up_to_date("generate_thumbnails", source)
+
+
+def test_in_place_rewrite_carries_over_to_other_in_place_tools(assets):
+    root, manifest = assets
+    source = str(root / "car.png")
+    rewrite_in_place(manifest, "strip_metadata", source, b"stripped")
+    rewrite_in_place(manifest, "remove_background", source, b"background removed")
+    assert manifest.is_up_to_date("remove_background", source)
+    assert manifest.is_up_to_date("strip_metadata", source)
+
+
+def test_touched_source_is_still_up_to_date(assets):
+    root, manifest = assets
+    source = str(root / "car.png")
+    manifest.record("generate_thumbnails", source)
+    st = os.stat(source)
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert manifest.is_up_to_date("generate_thumbnails", source)
+
+
+def test_in_place_rewrite_makes_mixed_tools_stale(assets):
+    # optimize_assets rewrites the source and also writes variants from it
+    root, manifest = assets
+    source, variant = str(root / "car.png"), str(root / "car.webp")
+    manifest.is_up_to_date("optimize_assets", source)
+    with open(variant, "wb") as f:
+        f.write(b"webp")
+    manifest.record("optimize_assets", source, outputs=[source, variant])
+
+    rewrite_in_place(manifest, "remove_background", source, b"background removed")
+    assert not manifest.is_up_to_date("optimize_assets", source)
@@ -0,0 +1,17 @@
+import asset_reachability
+
+SOURCE = """
+class Help {
+  final url = 'https://example.com/docs'; final icon = 'assets/images/help.png';
+  // final old = 'assets/images/old.png';
+  String car(String model) => 'assets/car_images/${model}_${getIndex(2)}.png';
+}
+"""
+
+
+def test_templates_after_a_url_are_found(tmp_path):
+    (tmp_path / "help.dart").write_text(SOURCE, encoding="utf-8")
+    templates = {t["template"]: t for t in asset_reachability.find_templates(str(tmp_path))}
+    assert set(templates) == {"assets/images/help.png", "assets/car_images/${model}_${getIndex(2)}.png"}
+    assert templates["assets/images/help.png"]["paths"] == ["assets/images/help.png"]
+    assert templates["assets/images/help.png"]["sites"][0].endswith("help.dart:3")
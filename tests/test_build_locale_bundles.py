@@ -0,0 +1,31 @@
+import json
+import build_locale_bundles
+from compare_translations import discover_locales, load_locale
+
+
+def test_bundle_round_trip():
+    data = {
+        "auth": {"login": "Log in", "logout": "Log out", "title": "Log in"},
+        "models": {"descriptions": {"Slim": ["Fast", "Light"], "Wide": ["Fast", "Light"]}},
+        "ok": "OK",
+        "shop": {"title": "Log in"},
+    }
+    flat = build_locale_bundles.flatten(data)
+    bundle = build_locale_bundles.pack(flat)
+    assert build_locale_bundles.unpack(json.loads(build_locale_bundles.encode(bundle))) == flat
+    assert bundle == {
+        "k": ["auth.login", "1:logout", "1:title", "models.descriptions.Slim", "2:Wide", "ok", "shop.title"],
+        "v": ["Log in", "Log out", 0, ["Fast", "Light"], 3, "OK", 0],
+    }
+
+
+def test_locales_round_trip():
+    for path in discover_locales().values():
+        data, _ = load_locale(path)
+        flat = build_locale_bundles.flatten(data)
+        assert build_locale_bundles.unpack(json.loads(build_locale_bundles.encode(build_locale_bundles.pack(flat)))) == flat
+
+
+def test_shipped_bundles_are_current():
+    # pubspec.yaml ships assets/lang_bundle/ only: rerun build_locale_bundles.py after editing assets/lang/
+    assert build_locale_bundles.build(check=True) == 0
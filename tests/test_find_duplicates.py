@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+import find_duplicates
+
+
+def clustered_hashes(rng, clusters=20, per_cluster=5, flips=6):
+    # Random 64-bit hashes with a few near copies of each
+    hashes = []
+    for _ in range(clusters):
+        base = int(rng.integers(0, 2 ** 63)) << 1 | int(rng.integers(0, 2))
+        for _ in range(per_cluster):
+            value = base
+            for bit in rng.choice(64, size=int(rng.integers(0, flips + 1)), replace=False):
+                value ^= 1 << int(bit)
+            hashes.append(value)
+    return hashes
+
+
+@pytest.mark.parametrize("radius", [0, 3, 10, 20])
+def test_bk_tree_search_matches_pairwise(radius):
+    rng = np.random.default_rng(radius)
+    hashes = clustered_hashes(rng)
+    tree = find_duplicates.BKTree()
+    for i, value in enumerate(hashes):
+        tree.add(value, i)
+    for value in hashes[::7]:
+        expected = sorted((find_duplicates.hamming(value, other), i) for i, other in enumerate(hashes)
+                          if find_duplicates.hamming(value, other) <= radius)
+        assert sorted(tree.search(value, radius)) == expected
+
+
+def test_group_duplicates_matches_pairwise():
+    rng = np.random.default_rng(0)
+    hashes = clustered_hashes(rng)
+    # Every other cluster member gets a different paint, which the colour check must split off
+    thumbs = [np.full((40, 64, 3), 10 * (i // 5) + (40 if i % 2 else 0), dtype=np.uint8) for i in range(len(hashes))]
+    entries = [(f"{i}.png", h, t, (64, 40), 0, str(i)) for i, (h, t) in enumerate(zip(hashes, thumbs))]
+    distance, max_diff = find_duplicates.DEFAULT_DISTANCE, find_duplicates.DEFAULT_MAX_DIFF
+    fast, comparisons = find_duplicates.group_duplicates(entries, distance, max_diff)
+    slow = find_duplicates.group_duplicates_pairwise(entries, distance, max_diff)
+    assert {frozenset(g) for g in fast} == {frozenset(g) for g in slow}
+    assert fast and all(len({i % 2 for i in g}) == 1 for g in fast)
+    assert comparisons < len(entries) * (len(entries) - 1) // 2
@@ -0,0 +1,66 @@
+import json
+import os
+import numpy as np
+import pytest
+from PIL import Image
+import pack_atlas
+
+
+def frame(seed, size=(90, 60)):
+    # Opaque noise with a transparent border, so frames get trimmed
+    rng = np.random.default_rng(seed)
+    pixels = np.zeros((size[1], size[0], 4), dtype=np.uint8)
+    pixels[5:-7, 9:-4] = rng.integers(0, 256, size=(size[1] - 12, size[0] - 13, 4))
+    pixels[5:-7, 9:-4, 3] = rng.integers(1, 256, size=(size[1] - 12, size[0] - 13))
+    return Image.fromarray(pixels, "RGBA")
+
+
+@pytest.fixture
+def model(tmp_path):
+    folder = tmp_path / "src" / "renauva" / "slim"
+    folder.mkdir(parents=True)
+    for name in ("slim.png", "slim_fixed.png", "slim_mask_fixed.png"):
+        frame(99, (300, 200)).save(folder / name)
+    for n in range(1, 7):
+        frame(n).save(folder / f"slim_{n}.png")
+    return tmp_path / "src", tmp_path / "out"
+
+
+def build(root, out_dir):
+    (rel_dir, sources), = pack_atlas.model_groups(str(root)).items()
+    _, _, outputs, _, error = pack_atlas.build_atlas(rel_dir, sources, str(root), str(out_dir))
+    assert error is None
+    return next(p for p in outputs if p.endswith(".json"))
+
+
+def test_only_numbered_frames_are_packed(model):
+    root, _ = model
+    (_, sources), = pack_atlas.model_groups(str(root)).items()
+    assert [os.path.basename(p) for p in sources] == [f"slim_{n}.png" for n in range(1, 7)]
+
+
+def test_atlas_round_trip(model):
+    root, out_dir = model
+    index_path = build(root, out_dir)
+    assert pack_atlas.validate_atlas(index_path, str(root)) == []
+    assert pack_atlas.check_all(str(out_dir), str(root)) == 0
+
+
+def test_check_fails_on_changed_source(model):
+    root, out_dir = model
+    index_path = build(root, out_dir)
+    frame(42).save(root / "renauva" / "slim" / "slim_3.png")
+    problems = pack_atlas.validate_atlas(index_path, str(root))
+    assert len(problems) == 1 and problems[0].startswith("slim_3:")
+
+
+def test_check_fails_when_a_sheet_is_in_the_atlas(model):
+    root, out_dir = model
+    index_path = build(root, out_dir)
+    with open(index_path) as f:
+        index = json.load(f)
+    index["frames"]["slim"] = dict(index["frames"]["slim_1"], source="renauva/slim/slim.png")
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+    problems = pack_atlas.validate_atlas(index_path, str(root))
+    assert problems == ["slim: renauva/slim/slim.png is not a <stem>_<N>.png frame (a source sheet?)"]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import recolor_vehicles
+
+
+def synthetic_car(seed=0):
+    rng = np.random.default_rng(seed)
+    rgba = rng.integers(0, 256, size=(48, 64, 4), dtype=np.uint8)
+    mask = np.zeros((48, 64), dtype=np.float32)
+    mask[10:30, 15:50] = 1
+    mask[9, 15:50] = 0.5  # Anti-aliased edge
+    return rgba, mask
+
+
+def palette_colours():
+    return {name: recolor_vehicles.parse_hex(hex_value) for name, (_, hex_value) in recolor_vehicles.PALETTE.items()}
+
+
+def test_pixels_outside_mask_untouched():
+    rgba, mask = synthetic_car()
+    outside = mask == 0
+    variants = list(recolor_vehicles.recolor(rgba, mask, palette_colours()))
+    assert len(variants) == len(recolor_vehicles.PALETTE)
+    for name, out in variants:
+        assert out.dtype == np.uint8 and out.shape == rgba.shape
+        assert np.array_equal(out[outside], rgba[outside]), name
+        assert np.array_equal(out[..., 3], rgba[..., 3]), name
+
+
+def test_inside_mask_takes_the_paint():
+    rgba, mask = synthetic_car(1)
+    colours = {"red": np.array([1, 0, 0], dtype=np.float32)}
+    _, out = next(recolor_vehicles.recolor(rgba, mask, colours))
+    painted = out[mask == 1]
+    assert not painted[:, 1:3].any()
+
+
+def test_empty_mask_is_refused():
+    rgba, mask = synthetic_car()
+    with pytest.raises(ValueError):
+        list(recolor_vehicles.recolor(rgba, np.zeros_like(mask), palette_colours()))
@@ -0,0 +1,50 @@
+import pytest
+from PIL import Image, ImageDraw
+import register_mask
+
+SCALE, OFFSET_X, OFFSET_Y = 1.02, -9.0, 4.0
+
+
+def car(size=(400, 300)):
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle((60, 80, 340, 220), radius=30, fill=(200, 30, 30, 255))
+    draw.polygon([(120, 80), (170, 40), (260, 40), (300, 80)], fill=(180, 30, 30, 255))
+    draw.ellipse((90, 190, 150, 250), fill=(20, 20, 20, 255))
+    draw.ellipse((250, 190, 310, 250), fill=(20, 20, 20, 255))
+    return img
+
+
+@pytest.fixture
+def pair(tmp_path):
+    # The mask is the car's silhouette moved by the inverse of a known transform
+    image = car()
+    silhouette = Image.new("RGB", image.size, (0, 0, 0))
+    silhouette.paste((255, 255, 255), mask=image.getchannel("A"))
+    mask = register_mask.warp(silhouette, image.size, 1 / SCALE, 1 / SCALE, -OFFSET_X / SCALE, -OFFSET_Y / SCALE)
+    image.save(tmp_path / "slim.png")
+    mask.save(tmp_path / "slim_mask.png")
+    return str(tmp_path / "slim.png"), str(tmp_path / "slim_mask.png")
+
+
+def test_register_recovers_known_transform(pair):
+    image_path, mask_path = pair
+    _, (sx, sy, ox, oy), error = register_mask.register_pair(mask_path, image_path, write=False)
+    assert error is None
+    assert sx == pytest.approx(SCALE, abs=0.005) and sy == pytest.approx(SCALE, abs=0.005)
+    assert ox == pytest.approx(OFFSET_X, abs=1.0) and oy == pytest.approx(OFFSET_Y, abs=1.0)
+
+
+def test_check_measures_the_aligned_mask(pair, tmp_path):
+    image_path, mask_path = pair
+    assert register_mask.register_all(str(tmp_path), workers=1, write=False, tolerance=1.0) == 1
+
+    assert register_mask.register_all(str(tmp_path), workers=1) == 0
+    assert register_mask.checked_path_for(mask_path) == register_mask.aligned_path_for(mask_path)
+    assert register_mask.register_all(str(tmp_path), workers=1, write=False, tolerance=1.0) == 0
+
+
+def test_workers_do_not_print_the_background_colour(pair, capsys):
+    image_path, mask_path = pair
+    register_mask.register_pair(mask_path, image_path, write=False)
+    assert "Background Color" not in capsys.readouterr().out
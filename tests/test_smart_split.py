@@ -0,0 +1,96 @@
+import json
+import numpy as np
+import pytest
+from PIL import Image
+import smart_split
+
+
+def sheet(seed, width=360, height=240):
+    # White sheet with a 2x3 grid of noisy cars and a few specks of noise
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 4), 255, dtype=np.uint8)
+    for row in range(2):
+        for col in range(3):
+            x1 = col * 120 + int(rng.integers(5, 20))
+            y1 = row * 120 + int(rng.integers(5, 20))
+            x2 = x1 + int(rng.integers(60, 95))
+            y2 = y1 + int(rng.integers(55, 95))
+            pixels[y1:y2, x1:x2, :3] = rng.integers(0, 200, size=(y2 - y1, x2 - x1, 3))
+    for _ in range(20):
+        y, x = rng.integers(0, height), rng.integers(0, width)
+        pixels[y, x, :3] = 0
+    return Image.fromarray(pixels, "RGBA")
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_detect_crops_matches_per_pixel_reference(seed):
+    img = sheet(seed)
+    assert smart_split.detect_crops(img) == smart_split.recursive_split_legacy(img, 0, 0)
+
+
+def test_detect_crops_finds_every_car():
+    crops = [c for c in smart_split.detect_crops(sheet(0)) if c[2] - c[0] >= 50 and c[3] - c[1] >= 50]
+    assert len(crops) == 6
+
+
+def test_plan_batch_skips_earlier_crops(tmp_path):
+    folder = tmp_path / "lotus"
+    folder.mkdir()
+    sheet(0).save(folder / "lotos.png")
+    smart_split.split_smart(str(folder / "lotos.png"))
+    sheets, skipped, conflicts = smart_split.plan_batch([str(folder / "*.png")])
+    assert sheets == [str(folder / "lotos.png")]
+    assert len(skipped) == 6
+    assert not conflicts
+
+
+def test_split_batch_refuses_sheets_sharing_a_prefix(tmp_path):
+    folder = tmp_path / "bavora"
+    folder.mkdir()
+    sheet(0).save(folder / "bavora.png")
+    sheet(1).save(folder / "bavora_e.png")
+    assert smart_split.split_batch([str(folder / "*.png")]) == 1
+    assert not list(folder.glob("bavora_[0-9]*.png"))
+
+
+def test_split_batch_reports_bad_sheets_and_keeps_going(tmp_path):
+    for name in ("good", "bad"):
+        (tmp_path / name).mkdir()
+    sheet(0).save(tmp_path / "good" / "sheet.png")
+    (tmp_path / "bad" / "sheet.png").write_bytes(b"not a png")
+    assert smart_split.split_batch([str(tmp_path / "*" / "sheet.png")], workers=2) == 1
+    assert len(list((tmp_path / "good").glob("good_*.png"))) == 6
+
+
+def test_sheet_named_like_a_crop_is_not_skipped(tmp_path, capsys):
+    folder = tmp_path / "lotus"
+    folder.mkdir()
+    sheet(0).save(folder / "lotus_2.png")
+    sheets, skipped, conflicts = smart_split.plan_batch([str(folder / "*.png")])
+    assert sheets == [str(folder / "lotus_2.png")] and not skipped
+    # Its own crops would include lotus_2.png, so it needs another prefix
+    assert smart_split.split_batch([str(folder / "*.png")]) == 1
+    assert "overwrite itself" in capsys.readouterr().out
+    assert smart_split.split_batch([str(folder / "*.png")], prefix="lotus_sheet") == 0
+    assert len(list(folder.glob("lotus_sheet_*.png"))) == 6
+
+
+def test_skipped_crops_come_from_the_index(tmp_path, capsys):
+    folder = tmp_path / "lotus"
+    folder.mkdir()
+    sheet(0).save(folder / "lotos.png")
+    smart_split.split_smart(str(folder / "lotos.png"))
+    with open(smart_split.index_path(str(folder / "lotos.png"))) as f:
+        index = json.load(f)
+    assert index["outputs"] == [f"lotus_{n}.png" for n in range(1, 7)]
+
+    # Indexes from before outputs were recorded fall back to the default names
+    del index["outputs"]
+    with open(smart_split.index_path(str(folder / "lotos.png")), "w") as f:
+        json.dump(index, f)
+    sheet(1).save(folder / "lotus_7.png")
+    sheets, skipped, _ = smart_split.plan_batch([str(folder / "*.png")])
+    assert sorted(skipped) == sorted(str(folder / f"lotus_{n}.png") for n in range(1, 7))
+    assert str(folder / "lotus_7.png") in sheets
+    smart_split.split_batch([str(folder / "lotos.png"), str(folder / "lotus_1.png")])
+    assert f"Skipping 1 crops {folder / 'lotos.png'} wrote: lotus_1.png" in capsys.readouterr().out
@@ -0,0 +1,33 @@
+import translation_usage
+
+SOURCE = r"""
+final a = 'shop.title'.tr(); // 'comment.key'.tr()
+final link = 'https://example.com/help'; final b = 'auth.login'.tr();
+/* final c = 'block.key'.tr(); */
+final d = '${'auth.noAccount'.tr()} ${labels['x']}';
+final e = tr('mixin.key');
+final f = Quest(titleKey: 'missions.level10.title');
+final g = 'vehicles.${vehicle.color}';
+final h = 'cars.${name}'.tr();
+"""
+
+
+def test_scan_source():
+    keys, patterns, literals = translation_usage.scan_source(SOURCE)
+    assert sorted(key for key, _ in keys) == ['auth.login', 'auth.noAccount', 'mixin.key', 'shop.title']
+    assert patterns == [['cars.${name}', 9]]
+    assert sorted(text for text, _ in literals) == [
+        'https://example.com/help', 'missions.level10.title', 'vehicles.${vehicle.color}']
+
+
+def test_string_literals_skip_comments_only():
+    values = [value for _, _, value in translation_usage.string_literals(SOURCE)]
+    assert 'comment.key' not in values and 'block.key' not in values
+    assert 'auth.login' in values and 'x' in values
+
+
+def test_reachable_from():
+    plain, dynamic = translation_usage.reachable_from(
+        {'auth.login': []}, {'cars.${name}': []}, {'missions.level10.title': [], 'vehicles.${c}': []})
+    assert plain == {'auth.login', 'missions.level10.title'}
+    assert dynamic.fullmatch('vehicles.red') and dynamic.fullmatch('cars.slim') and not dynamic.fullmatch('other.x')
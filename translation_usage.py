@@ -0,0 +1,255 @@
+import bisect
+import json
+import os
+import re
+import sys
+import time
+from compare_translations import LANG_DIR, REFERENCE_LOCALE, discover_locales, get_keys, load_locale, walk
+
+# Index of translation keys used in lib/**/*.dart, cached per file by mtime so
+# reruns only rescan edited files. Crossed with the locale key sets it lists
+# keys nobody references (unused) and references with no key (missing).
+# Keys also travel in variables and model fields (titleKey: 'missions.x',
+# later titleKey.tr()), so any dotted string literal counts as a reference.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LIB_DIR = os.path.join(ROOT, 'lib')
+CACHE_PATH = os.path.join(ROOT, '.translation_usage_cache.json')
+CACHE_VERSION = 2
+
+# ${...} is matched whole so quotes inside an interpolation don't end the literal
+STRING_LITERAL = r"""(?P<q>['"])(?P<key>(?:\$\{[^}\n]*\}|(?!(?P=q))[^\\\n]|\\.)*)(?P=q)"""
+# Comments, string openings and braces; string bodies are walked separately
+CODE_TOKEN_RE = re.compile(
+    r"(?P<comment>//[^\n]*|/\*(?s:.*?)\*/)"
+    r"|(?P<string>(?:(?<![\w$])r)?(?:'''|\"\"\"|'|\"))"
+    r"|(?P<open>\{)|(?P<close>\})"
+)
+STRING_PART_RES = {
+    quote: re.compile(r"\\.|\$\{|" + re.escape(quote) + ("" if len(quote) == 3 else r"|\n"), re.S)
+    for quote in ("'", '"', "'''", '"""')
+}
+# 'key'.tr() / .trParams() / .trList(), possibly split across lines, after the
+# literal; the LocalizationMixin form tr('key') / trParams('key', ...) before it
+EXTENSION_RE = re.compile(r"\s*\.\s*tr(?:Params|List)?\(")
+MIXIN_RE = re.compile(r"(?<![\w.])tr(?:Params)?\(\s*\Z")
+MIXIN_LOOKBACK = 64
+INTERPOLATION_RE = re.compile(r"\$\{[^}]*\}|\$\w+")
+# Interpolated literals only count as key patterns with a fixed 'section.' head
+KEY_PATTERN_RE = re.compile(r"[A-Za-z]\w*\.[\w.]*\$")
+# Cached results are only valid for the patterns that produced them
+SCANNER_ID = ":".join(str(x) for x in (
+    CACHE_VERSION, CODE_TOKEN_RE.pattern, EXTENSION_RE.pattern, MIXIN_RE.pattern, KEY_PATTERN_RE.pattern))
+
+
+def _string_body(text, pos, quote):
+    # Returns (position, state) after the closing quote ('end'), after '${'
+    # ('interp'), or where the line or file ends first (None)
+    string_re = STRING_PART_RES[quote]
+    while True:
+        s = string_re.search(text, pos)
+        if not s:
+            return len(text), None
+        pos = s.end()
+        if s.group() == '\n':
+            return pos, None
+        if s.group() == '${':
+            return pos, 'interp'
+        if s.group() == quote:
+            return pos, 'end'
+
+
+def string_literals(text):
+    # (start, end, value) of every string literal outside comments, also
+    # those nested in ${...}; value is the source between the quotes. One
+    # left-to-right pass, so '//' inside a literal (a URL) is not a comment
+    # and quotes inside a comment are not literals.
+    stack = []  # None for a code brace, (start, quote, body start) for an open ${
+    pos = 0
+    while True:
+        m = CODE_TOKEN_RE.search(text, pos)
+        if not m:
+            return
+        kind, pos = m.lastgroup, m.end()
+        if kind == 'comment':
+            continue
+        if kind == 'open':
+            stack.append(None)
+            continue
+        if kind == 'close':
+            frame = stack.pop() if stack else None
+            if frame is None:
+                continue
+        else:
+            token = m.group('string')
+            frame = (m.start(), token.lstrip('r'), pos)
+            if token.startswith('r'):
+                end = text.find(frame[1], pos)
+                if end < 0:
+                    return
+                pos = end + len(frame[1])
+                yield frame[0], pos, text[frame[2]:end]
+                continue
+        pos, state = _string_body(text, pos, frame[1])
+        if state == 'interp':
+            stack.append(frame)
+        elif state == 'end':
+            yield frame[0], pos, text[frame[2]:pos - len(frame[1])]
+
+
+def scan_source(text):
+    # Returns ([key, line], ...) for .tr() calls on plain literals,
+    # ([pattern, line], ...) for interpolated ones like 'vehicles.${vehicle.color}',
+    # and ([literal, line], ...) for other dotted or key-pattern literals
+    newlines = [m.start() for m in re.finditer('\n', text)]
+    keys, patterns, literals = [], [], []
+    for start, end, key in string_literals(text):
+        line = bisect.bisect_left(newlines, start) + 1
+        translated = (EXTENSION_RE.match(text, end)
+                      or MIXIN_RE.search(text, max(0, start - MIXIN_LOOKBACK), start))
+        if translated:
+            if '$' in key:
+                patterns.append([key, line])
+            elif key:
+                keys.append([key, line])
+        elif KEY_PATTERN_RE.match(key) if '$' in key else '.' in key:
+            literals.append([key, line])
+    return keys, patterns, literals
+
+
+def dart_files(lib_dir=LIB_DIR):
+    for root, _, filenames in os.walk(lib_dir):
+        for name in sorted(filenames):
+            if name.endswith('.dart'):
+                yield os.path.join(root, name)
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, 'r') as f:
+            cache = json.load(f)
+        if cache.get('scanner') == SCANNER_ID:
+            return cache['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(files, path=CACHE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'scanner': SCANNER_ID, 'files': files}, f)
+    os.replace(tmp_path, path)
+
+
+def build_index(lib_dir=LIB_DIR, use_cache=True):
+    cached = load_cache() if use_cache else {}
+    files = {}
+    rescanned = 0
+    for path in dart_files(lib_dir):
+        rel = os.path.relpath(path, ROOT)
+        st = os.stat(path)
+        entry = cached.get(rel)
+        if not entry or entry['mtime_ns'] != st.st_mtime_ns or entry['size'] != st.st_size:
+            with open(path, 'r', encoding='utf-8') as f:
+                keys, patterns, literals = scan_source(f.read())
+            entry = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                     'keys': keys, 'patterns': patterns, 'literals': literals}
+            rescanned += 1
+        files[rel] = entry
+    if use_cache and (rescanned or files.keys() != cached.keys()):
+        save_cache(files)
+
+    # Each is {key, pattern or literal: ["lib/...dart:line", ...]}
+    usages, patterns, literals = {}, {}, {}
+    for rel, entry in files.items():
+        for index, field in ((usages, 'keys'), (patterns, 'patterns'), (literals, 'literals')):
+            for text, line in entry[field]:
+                index.setdefault(text, []).append(f"{rel}:{line}")
+    return usages, patterns, literals, len(files), rescanned
+
+
+def pattern_regex(patterns):
+    # 'vehicles.${vehicle.color}' -> vehicles\..+ ; all patterns in one alternation
+    parts = []
+    for pattern in patterns:
+        pieces = INTERPOLATION_RE.split(pattern)
+        parts.append('.+'.join(re.escape(p) for p in pieces))
+    return re.compile('|'.join(f'(?:{p})' for p in parts)) if parts else None
+
+
+def reachable_from(usages, patterns, literals):
+    # (plain keys, regex of dynamic patterns or None) the code can reach:
+    # .tr() keys plus dotted literals, interpolated ones as wildcards
+    plain = set(usages) | {text for text in literals if '$' not in text}
+    dynamic = pattern_regex(set(patterns) | {text for text in literals if '$' in text})
+    return plain, dynamic
+
+
+def reachable(lib_dir=LIB_DIR, use_cache=True):
+    usages, patterns, literals, _, _ = build_index(lib_dir, use_cache)
+    return reachable_from(usages, patterns, literals)
+
+
+def leaf_keys(data):
+    return {key for key, value in walk(data) if not isinstance(value, dict)}
+
+
+def report(lib_dir=LIB_DIR, lang_dir=LANG_DIR, use_cache=True, reference=REFERENCE_LOCALE):
+    start = time.perf_counter()
+    usages, patterns, literals, file_count, rescanned = build_index(lib_dir, use_cache)
+    call_sites = sum(len(v) for v in usages.values()) + sum(len(v) for v in patterns.values())
+    print(f"Indexed {call_sites} call sites ({len(usages)} keys, {len(patterns)} dynamic) "
+          f"in {file_count} files, {rescanned} rescanned, {time.perf_counter() - start:.2f}s")
+
+    plain, dynamic = reachable_from(usages, patterns, literals)
+    problems = 0
+    for code, path in discover_locales(lang_dir).items():
+        data, errors = load_locale(path)
+        if data is None:
+            print(f"❌ {code}.json: {errors[0]}")
+            problems += 1
+            continue
+
+        keys = get_keys(data)
+        missing = sorted(set(usages) - keys)
+        problems += len(missing)
+        print(f"\n{code}.json: {len(missing)} referenced keys missing")
+        for key in missing:
+            print(f"  {key}  ({', '.join(usages[key])})")
+
+        if code == reference:
+            leaves = leaf_keys(data)
+            unused = sorted(
+                key for key in leaves - plain
+                if not (dynamic and dynamic.fullmatch(key))
+            )
+            print(f"\n{code}.json: {len(unused)} of {len(leaves)} keys unused "
+                  f"(no .tr() call, string literal or dynamic pattern reaches them)")
+            for key in unused:
+                print(f"  {key}")
+    return problems
+
+
+def where(key, lib_dir=LIB_DIR, use_cache=True):
+    usages, patterns, literals, _, _ = build_index(lib_dir, use_cache)
+    for location in usages.get(key, []):
+        print(location)
+    for location in literals.get(key, []):
+        print(f"{location}  (literal)")
+    for pattern, locations in patterns.items():
+        if pattern_regex([pattern]).fullmatch(key):
+            for location in locations:
+                print(f"{location}  (via '{pattern}')")
+
+
+if __name__ == "__main__":
+    use_cache = '--no-cache' not in sys.argv
+    args = [a for a in sys.argv[1:] if a != '--no-cache']
+    if len(args) == 2 and args[0] == '--where':
+        where(args[1], use_cache=use_cache)
+    elif args:
+        print("Usage: python3 translation_usage.py [--no-cache] [--where KEY]")
+        sys.exit(1)
+    else:
+        sys.exit(1 if report(use_cache=use_cache) else 0)
@@ -1,17 +1,17 @@
-import json
 import sys
+from compare_translations import LANG_DIR, discover_locales, load_locale
 
-files = [
-    '/Users/selimyay/cebinden/assets/translations/en.json',
-    '/Users/selimyay/cebinden/assets/translations/tr.json'
-]
+# Syntax-only check; compare_translations.py also compares keys and placeholders
+lang_dir = sys.argv[1] if len(sys.argv) > 1 else LANG_DIR
+failed = False
 
-for file_path in files:
-    try:
-        with open(file_path, 'r') as f:
-            json.load(f)
+for code, file_path in discover_locales(lang_dir).items():
+    _, errors = load_locale(file_path)
+    if errors:
+        failed = True
+        for error in errors:
+            print(f"❌ {error}")
+    else:
         print(f"✅ {file_path} is valid JSON")
-    except json.JSONDecodeError as e:
-        print(f"❌ {file_path} has JSON error: {e}")
-    except Exception as e:
-        print(f"❌ {file_path} error: {e}")
+
+sys.exit(1 if failed else 0)